@@ -44,6 +44,12 @@ contract Joint {
     uint256 public ratio = 500;
     uint256 public constant MAX_RATIO = 1000;
     IMasterchef public masterchef;
+    // Rewards are only swapped once the batch is at least minRewardToSell
+    // and worth minRewardValue of tokenA at the pair reserves
+    uint256 public minRewardToSell;
+    uint256 public minRewardValue;
+    // Claimed rewards kept for a later harvest, they are not capital
+    uint256 public carriedReward;
 
     modifier onlyGov {
         require(msg.sender == governance);
@@ -183,19 +189,35 @@ contract Joint {
     }
 
     function harvest() external onlyGuardians {
-        // IF tokenA or tokenB are rewards, we would be swapping all of it
-        // Let's save the previous balance before claiming
-        uint256 previousBalanceOfReward = balanceOfReward();
-
-        // Gets the reward from the masterchef contract
-        getReward();
-        uint256 rewardProfit = balanceOfReward().sub(previousBalanceOfReward);
-        if (rewardProfit > 0) {
-            swapReward(rewardProfit);
+        // Small batches are neither claimed nor swapped, they are carried
+        // over until a later harvest makes them worth the gas. Without
+        // reinvest this is the last harvest, everything is sold so that
+        // both providers get their share of the rewards
+        uint256 carried = Math.min(carriedReward, balanceOfReward());
+        bool sell =
+            !reinvest ||
+                (minRewardToSell == 0 && minRewardValue == 0) ||
+                isRewardAboveMin(carried.add(pendingReward()));
+
+        if (sell) {
+            // IF tokenA or tokenB are rewards, we would be swapping all of it
+            // Let's save the previous balance before claiming
+            uint256 previousBalanceOfReward = balanceOfReward();
+
+            // Gets the reward from the masterchef contract
+            getReward();
+            uint256 rewardProfit =
+                balanceOfReward().sub(previousBalanceOfReward).add(carried);
+            carriedReward = 0;
+            if (rewardProfit > 0) {
+                swapReward(rewardProfit);
+            }
+        } else {
+            carriedReward = carried;
         }
 
         // No capital, nothing to do
-        if (balanceOfA() == 0 && balanceOfB() == 0) {
+        if (capitalOf(tokenA) == 0 && capitalOf(tokenB) == 0) {
             return;
         }
 
@@ -208,11 +230,17 @@ contract Joint {
     }
 
     function createLP() internal {
+        uint256 amountA = capitalOf(tokenA);
+        uint256 amountB = capitalOf(tokenB);
+        if (amountA == 0 || amountB == 0) {
+            return;
+        }
+
         IUniswapV2Router02(router).addLiquidity(
             tokenA,
             tokenB,
-            balanceOfA(),
-            balanceOfB(),
+            amountA,
+            amountB,
             0,
             0,
             address(this),
@@ -265,7 +293,14 @@ contract Joint {
     }
 
     function depositLP() internal {
-        if (balanceOfPair() > 0) masterchef.deposit(pid, balanceOfPair());
+        if (balanceOfPair() > 0) {
+            // Depositing pays pending rewards, keep them out of the capital
+            uint256 previousBalanceOfReward = balanceOfReward();
+            masterchef.deposit(pid, balanceOfPair());
+            carriedReward = carriedReward.add(
+                balanceOfReward().sub(previousBalanceOfReward)
+            );
+        }
     }
 
     function swapReward(uint256 _rewardBal) internal {
@@ -316,7 +351,139 @@ contract Joint {
         );
     }
 
+    // Gets everything out in one transaction when the masterchef or one of
+    // the tokens can't be trusted. Rewards are forfeited: nothing is claimed
+    // or swapped, both sides go straight back to the providers
+    function emergencyExit() external onlyGuardians {
+        reinvest = false;
+
+        if (balanceOfStake() > 0) {
+            masterchef.emergencyWithdraw(pid);
+        }
+
+        uint256 lpAmount = balanceOfPair();
+        if (lpAmount > 0) {
+            IUniswapV2Router02(router).removeLiquidity(
+                tokenA,
+                tokenB,
+                lpAmount,
+                0,
+                0,
+                address(this),
+                now
+            );
+        }
+
+        distributeProfit();
+    }
+
+    // Withdraws and removes only _lpAmount of the staked LP, leaving the rest
+    // staked. Both tokens are kept in the joint until the next harvest
+    function liquidatePartialPosition(uint256 _lpAmount) public onlyGuardians {
+        _liquidateLP(_lpAmount);
+    }
+
+    // Called by a provider to get back _amountNeeded of its want without
+    // unwinding the whole position. Idle balance is used first and then only
+    // the LP needed to cover the rest is removed. The other side of the
+    // removed liquidity stays in the joint
+    function liquidateForProvider(uint256 _amountNeeded)
+        external
+        returns (uint256 _liquidatedAmount)
+    {
+        require(msg.sender == providerA || msg.sender == providerB);
+        address token = msg.sender == providerA ? tokenA : tokenB;
+
+        // Carried rewards belong to both providers, they are not paid out
+        uint256 balance = capitalOf(token);
+        if (_amountNeeded > balance) {
+            _liquidateLP(
+                lpForAmount(token, _amountNeeded.sub(balance)).add(1)
+            );
+            balance = capitalOf(token);
+        }
+
+        _liquidatedAmount = Math.min(_amountNeeded, balance);
+        if (_liquidatedAmount > 0) {
+            IERC20(token).transfer(msg.sender, _liquidatedAmount);
+        }
+    }
+
+    function _liquidateLP(uint256 _lpAmount) internal {
+        uint256 stake = balanceOfStake();
+        uint256 unstaked = balanceOfPair();
+        if (_lpAmount > unstaked && stake > 0) {
+            // Withdrawing pays pending rewards, keep them out of the capital
+            uint256 previousBalanceOfReward = balanceOfReward();
+            masterchef.withdraw(pid, Math.min(_lpAmount - unstaked, stake));
+            carriedReward = carriedReward.add(
+                balanceOfReward().sub(previousBalanceOfReward)
+            );
+        }
+
+        uint256 lpAmount = Math.min(_lpAmount, balanceOfPair());
+        if (lpAmount == 0) {
+            return;
+        }
+
+        IUniswapV2Router02(router).removeLiquidity(
+            tokenA,
+            tokenB,
+            lpAmount,
+            0,
+            0,
+            address(this),
+            now
+        );
+    }
+
+    // LP tokens that need to be burnt to get _amount of _token back
+    function lpForAmount(address _token, uint256 _amount)
+        public
+        view
+        returns (uint256)
+    {
+        address pair = getPair();
+        uint256 reserve = IERC20(_token).balanceOf(pair);
+        if (reserve == 0) {
+            return 0;
+        }
+        return _amount.mul(IERC20(pair).totalSupply()).div(reserve);
+    }
+
+    // Amounts to send to the joint, out of what each provider can send, so
+    // that both sides match the pool ratio and createLP leaves no dust
+    function balancedAmounts(uint256 _availableA, uint256 _availableB)
+        public
+        view
+        returns (uint256 _amountA, uint256 _amountB)
+    {
+        address pair = getPair();
+        uint256 reserveA = IERC20(tokenA).balanceOf(pair);
+        uint256 reserveB = IERC20(tokenB).balanceOf(pair);
+        if (reserveA == 0 || reserveB == 0) {
+            return (_availableA, _availableB);
+        }
+
+        uint256 balanceA = capitalOf(tokenA);
+        uint256 balanceB = capitalOf(tokenB);
+        uint256 totalA = balanceA.add(_availableA);
+        uint256 totalB = balanceB.add(_availableB);
+        if (totalA.mul(reserveB) > totalB.mul(reserveA)) {
+            // tokenB is the limiting side
+            _amountB = _availableB;
+            uint256 neededA = totalB.mul(reserveA).div(reserveB);
+            _amountA = neededA > balanceA ? neededA - balanceA : 0;
+        } else {
+            _amountA = _availableA;
+            uint256 neededB = totalA.mul(reserveB).div(reserveA);
+            _amountB = neededB > balanceB ? neededB - balanceB : 0;
+        }
+    }
+
     function distributeProfit() internal {
+        carriedReward = 0;
+
         uint256 balanceA = balanceOfA();
         if (balanceA > 0) {
             IERC20(tokenA).transfer(providerA, balanceA);
@@ -328,6 +495,36 @@ contract Joint {
         }
     }
 
+    // Balance of _token that can go into the pool, carried rewards excluded
+    function capitalOf(address _token) public view returns (uint256) {
+        uint256 balance = IERC20(_token).balanceOf(address(this));
+        if (_token != reward) {
+            return balance;
+        }
+        return balance.sub(Math.min(carriedReward, balance));
+    }
+
+    // Value of _amount of reward in tokenA at the pair reserves
+    function rewardValue(uint256 _amount) public view returns (uint256) {
+        if (reward == tokenA) {
+            return _amount;
+        }
+
+        address pair = getPair();
+        uint256 reserve = IERC20(reward).balanceOf(pair);
+        if (reserve == 0) {
+            return 0;
+        }
+        return _amount.mul(IERC20(tokenA).balanceOf(pair)).div(reserve);
+    }
+
+    function isRewardAboveMin(uint256 _amount) public view returns (bool) {
+        return
+            _amount > 0 &&
+            _amount >= minRewardToSell &&
+            rewardValue(_amount) >= minRewardValue;
+    }
+
     function getPair() public view returns (address) {
         address factory = IUniswapV2Router02(router).factory();
         return IUniswapV2Factory(factory).getPair(tokenA, tokenB);
@@ -362,6 +559,14 @@ contract Joint {
         ratio = _ratio;
     }
 
+    function setMinReward(uint256 _minRewardToSell, uint256 _minRewardValue)
+        external
+        onlyGovOrStrategist
+    {
+        minRewardToSell = _minRewardToSell;
+        minRewardValue = _minRewardValue;
+    }
+
     function setReinvest(bool _reinvest) external onlyGovOrStrategist {
         reinvest = _reinvest;
     }
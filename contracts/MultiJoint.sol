@@ -0,0 +1,621 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20,
+    Address
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import "@openzeppelin/contracts/math/Math.sol";
+
+import "../interfaces/uni/IUniswapV2Router02.sol";
+import "../interfaces/uni/IUniswapV2Factory.sol";
+import "../interfaces/IMasterChef.sol";
+
+interface IERC20Extended {
+    function decimals() external view returns (uint8);
+
+    function name() external view returns (string memory);
+
+    function symbol() external view returns (string memory);
+}
+
+// Same role as Joint for one pair of providers, but the capital is spread
+// over several farms of the tokenA/tokenB pair. Each position is a router,
+// its pair, a masterchef and a pid. Capital is split between them by weight
+// and a single harvest claims, compounds and rebalances all of them
+contract MultiJoint {
+    using SafeERC20 for IERC20;
+    using Address for address;
+    using SafeMath for uint256;
+
+    struct Position {
+        address router;
+        address pair;
+        IMasterchef masterchef;
+        uint256 pid;
+        address reward;
+        uint256 weight;
+    }
+
+    address public tokenA;
+    address public providerA;
+    address public tokenB;
+    address public providerB;
+    bool public reinvest;
+
+    address public governance;
+    address public pendingGovernance;
+    address public keeper;
+    address public strategist;
+    address public WETH;
+    uint256 public ratio;
+    uint256 public constant MAX_RATIO = 1000;
+    // Positions over their target by more than this are trimmed on harvest
+    uint256 public rebalanceThreshold;
+    uint256 public constant MAX_BPS = 10000;
+
+    Position[] public positions;
+    uint256 public totalWeight;
+
+    modifier onlyGov {
+        require(msg.sender == governance);
+        _;
+    }
+
+    modifier onlyGovOrStrategist {
+        require(msg.sender == governance || msg.sender == strategist);
+        _;
+    }
+
+    modifier onlyGuardians {
+        require(
+            msg.sender == strategist ||
+                msg.sender == keeper ||
+                msg.sender == governance
+        );
+        _;
+    }
+
+    constructor(
+        address _governance,
+        address _keeper,
+        address _strategist,
+        address _tokenA,
+        address _tokenB,
+        address _WETH
+    ) public {
+        _initialize(_governance, _keeper, _strategist, _tokenA, _tokenB, _WETH);
+    }
+
+    function initialize(
+        address _governance,
+        address _keeper,
+        address _strategist,
+        address _tokenA,
+        address _tokenB,
+        address _WETH
+    ) external {
+        _initialize(_governance, _keeper, _strategist, _tokenA, _tokenB, _WETH);
+    }
+
+    function _initialize(
+        address _governance,
+        address _keeper,
+        address _strategist,
+        address _tokenA,
+        address _tokenB,
+        address _WETH
+    ) internal {
+        require(address(tokenA) == address(0), "Joint already initialized");
+
+        governance = _governance;
+        keeper = _keeper;
+        strategist = _strategist;
+        tokenA = _tokenA;
+        tokenB = _tokenB;
+        WETH = _WETH;
+        reinvest = true;
+        ratio = 500;
+        rebalanceThreshold = 500;
+    }
+
+    event Cloned(address indexed clone);
+
+    function cloneMultiJoint(
+        address _governance,
+        address _keeper,
+        address _strategist,
+        address _tokenA,
+        address _tokenB,
+        address _WETH
+    ) external returns (address newJoint) {
+        bytes20 addressBytes = bytes20(address(this));
+
+        assembly {
+            // EIP-1167 bytecode
+            let clone_code := mload(0x40)
+            mstore(
+                clone_code,
+                0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000
+            )
+            mstore(add(clone_code, 0x14), addressBytes)
+            mstore(
+                add(clone_code, 0x28),
+                0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000
+            )
+            newJoint := create(0, clone_code, 0x37)
+        }
+
+        MultiJoint(newJoint).initialize(
+            _governance,
+            _keeper,
+            _strategist,
+            _tokenA,
+            _tokenB,
+            _WETH
+        );
+
+        emit Cloned(newJoint);
+    }
+
+    function name() external view returns (string memory) {
+        string memory ab =
+            string(
+                abi.encodePacked(
+                    IERC20Extended(address(tokenA)).symbol(),
+                    IERC20Extended(address(tokenB)).symbol()
+                )
+            );
+
+        return string(abi.encodePacked("MultiJointOf", ab));
+    }
+
+    // The tokenA/tokenB pair of _router must be the LP of _pid in _masterchef
+    // and not be used by another position
+    function addPosition(
+        address _router,
+        address _masterchef,
+        uint256 _pid,
+        address _reward,
+        uint256 _weight
+    ) external onlyGov {
+        address factory = IUniswapV2Router02(_router).factory();
+        address pair = IUniswapV2Factory(factory).getPair(tokenA, tokenB);
+        require(pair != address(0), "!pair");
+        // Unstaked LP is counted per pair, so each pair can only be used once
+        for (uint256 i = 0; i < positions.length; i++) {
+            require(positions[i].pair != pair, "!duplicate");
+        }
+        require(
+            IMasterchef(_masterchef).poolInfo(_pid).lpToken == pair,
+            "!pid"
+        );
+
+        positions.push(
+            Position(
+                _router,
+                pair,
+                IMasterchef(_masterchef),
+                _pid,
+                _reward,
+                _weight
+            )
+        );
+        totalWeight = totalWeight.add(_weight);
+
+        IERC20(pair).approve(_masterchef, type(uint256).max);
+        IERC20(pair).approve(_router, type(uint256).max);
+        IERC20(tokenA).approve(_router, type(uint256).max);
+        IERC20(tokenB).approve(_router, type(uint256).max);
+        IERC20(_reward).approve(_router, type(uint256).max);
+    }
+
+    // A weight of 0 unwinds the position on the next harvest
+    function setWeight(uint256 _index, uint256 _weight)
+        external
+        onlyGovOrStrategist
+    {
+        totalWeight = totalWeight.sub(positions[_index].weight).add(_weight);
+        positions[_index].weight = _weight;
+    }
+
+    function harvest() external onlyGuardians {
+        for (uint256 i = 0; i < positions.length; i++) {
+            _claim(i);
+        }
+
+        if (reinvest) {
+            _rebalance();
+        } else {
+            distributeProfit();
+        }
+    }
+
+    function _claim(uint256 _index) internal {
+        Position memory position = positions[_index];
+        if (_balanceOfStake(position) == 0) {
+            return;
+        }
+
+        // IF tokenA or tokenB are rewards, we would be swapping all of it
+        // Let's save the previous balance before claiming
+        uint256 previousBalanceOfReward =
+            IERC20(position.reward).balanceOf(address(this));
+        position.masterchef.deposit(position.pid, 0);
+        uint256 balanceOfReward =
+            IERC20(position.reward).balanceOf(address(this));
+
+        if (position.reward == tokenA || position.reward == tokenB) {
+            uint256 rewardProfit = balanceOfReward.sub(previousBalanceOfReward);
+            if (rewardProfit > 0 && ratio > 0) {
+                _swap(
+                    position.router,
+                    position.reward,
+                    position.reward == tokenA ? tokenB : tokenA,
+                    rewardProfit.mul(ratio).div(MAX_RATIO)
+                );
+            }
+        } else if (balanceOfReward > 0) {
+            // Rewards outside the pair are sold half for each side
+            uint256 half = balanceOfReward.div(2);
+            _swap(position.router, position.reward, tokenA, half);
+            _swap(
+                position.router,
+                position.reward,
+                tokenB,
+                balanceOfReward.sub(half)
+            );
+        }
+    }
+
+    // Trims the positions that are over their weight and adds every idle
+    // token to the ones under it, so new capital, compounded rewards and
+    // weight changes are all handled by the same pass
+    function _rebalance() internal {
+        uint256 length = positions.length;
+        if (length == 0 || totalWeight == 0) {
+            return;
+        }
+
+        uint256[] memory values = new uint256[](length);
+        uint256 total = idleValue();
+        for (uint256 i = 0; i < length; i++) {
+            values[i] = positionValue(i);
+            total = total.add(values[i]);
+        }
+        if (total == 0) {
+            return;
+        }
+
+        uint256[] memory deficits = new uint256[](length);
+        uint256 totalDeficit;
+        for (uint256 i = 0; i < length; i++) {
+            uint256 target = total.mul(positions[i].weight).div(totalWeight);
+            if (values[i] > target) {
+                uint256 excess = values[i] - target;
+                if (excess > target.mul(rebalanceThreshold).div(MAX_BPS)) {
+                    _removeLP(
+                        i,
+                        balanceOfLP(i).mul(excess).div(values[i])
+                    );
+                }
+            } else {
+                deficits[i] = target - values[i];
+                totalDeficit = totalDeficit.add(deficits[i]);
+            }
+        }
+        if (totalDeficit == 0) {
+            return;
+        }
+
+        uint256 balanceA = balanceOfA();
+        uint256 balanceB = balanceOfB();
+        for (uint256 i = 0; i < length; i++) {
+            if (deficits[i] > 0) {
+                _addLP(
+                    i,
+                    balanceA.mul(deficits[i]).div(totalDeficit),
+                    balanceB.mul(deficits[i]).div(totalDeficit)
+                );
+            }
+        }
+    }
+
+    function _addLP(
+        uint256 _index,
+        uint256 _amountA,
+        uint256 _amountB
+    ) internal {
+        if (_amountA == 0 || _amountB == 0) {
+            return;
+        }
+
+        Position memory position = positions[_index];
+        IUniswapV2Router02(position.router).addLiquidity(
+            tokenA,
+            tokenB,
+            _amountA,
+            _amountB,
+            0,
+            0,
+            address(this),
+            now
+        );
+
+        uint256 lpAmount = IERC20(position.pair).balanceOf(address(this));
+        if (lpAmount > 0) {
+            position.masterchef.deposit(position.pid, lpAmount);
+        }
+    }
+
+    function _removeLP(uint256 _index, uint256 _lpAmount) internal {
+        Position memory position = positions[_index];
+        uint256 stake = _balanceOfStake(position);
+        uint256 unstaked = IERC20(position.pair).balanceOf(address(this));
+        if (_lpAmount > unstaked && stake > 0) {
+            position.masterchef.withdraw(
+                position.pid,
+                Math.min(_lpAmount - unstaked, stake)
+            );
+        }
+
+        uint256 lpAmount =
+            Math.min(_lpAmount, IERC20(position.pair).balanceOf(address(this)));
+        if (lpAmount == 0) {
+            return;
+        }
+
+        IUniswapV2Router02(position.router).removeLiquidity(
+            tokenA,
+            tokenB,
+            lpAmount,
+            0,
+            0,
+            address(this),
+            now
+        );
+    }
+
+    function _swap(
+        address _router,
+        address _tokenFrom,
+        address _tokenTo,
+        uint256 _amount
+    ) internal {
+        IUniswapV2Router02(_router)
+            .swapExactTokensForTokensSupportingFeeOnTransferTokens(
+            _amount,
+            0,
+            getTokenOutPath(_tokenFrom, _tokenTo),
+            address(this),
+            now
+        );
+    }
+
+    function getTokenOutPath(address _token_in, address _token_out)
+        internal
+        view
+        returns (address[] memory _path)
+    {
+        bool is_weth =
+            _token_in == address(WETH) || _token_out == address(WETH);
+        _path = new address[](is_weth ? 2 : 3);
+        _path[0] = _token_in;
+        if (is_weth) {
+            _path[1] = _token_out;
+        } else {
+            _path[1] = address(WETH);
+            _path[2] = _token_out;
+        }
+    }
+
+    // If there is a lot of impermanent loss, some capital will need to be sold
+    // To make both sides even
+    function sellCapital(
+        uint256 _index,
+        address _tokenFrom,
+        address _tokenTo,
+        uint256 _amount
+    ) external onlyGovOrStrategist {
+        _swap(positions[_index].router, _tokenFrom, _tokenTo, _amount);
+    }
+
+    function liquidatePosition() public onlyGuardians {
+        for (uint256 i = 0; i < positions.length; i++) {
+            _removeLP(i, balanceOfLP(i));
+        }
+    }
+
+    // Same as Joint.emergencyExit for every position at once
+    function emergencyExit() external onlyGuardians {
+        reinvest = false;
+
+        for (uint256 i = 0; i < positions.length; i++) {
+            Position memory position = positions[i];
+            if (_balanceOfStake(position) > 0) {
+                position.masterchef.emergencyWithdraw(position.pid);
+            }
+
+            uint256 lpAmount = IERC20(position.pair).balanceOf(address(this));
+            if (lpAmount > 0) {
+                IUniswapV2Router02(position.router).removeLiquidity(
+                    tokenA,
+                    tokenB,
+                    lpAmount,
+                    0,
+                    0,
+                    address(this),
+                    now
+                );
+            }
+        }
+
+        distributeProfit();
+    }
+
+    // Same as Joint.liquidateForProvider, positions are unwound in order
+    // until _amountNeeded is covered
+    function liquidateForProvider(uint256 _amountNeeded)
+        external
+        returns (uint256 _liquidatedAmount)
+    {
+        require(msg.sender == providerA || msg.sender == providerB);
+        address token = msg.sender == providerA ? tokenA : tokenB;
+
+        uint256 balance = IERC20(token).balanceOf(address(this));
+        for (
+            uint256 i = 0;
+            i < positions.length && _amountNeeded > balance;
+            i++
+        ) {
+            _removeLP(
+                i,
+                lpForAmount(i, token, _amountNeeded.sub(balance)).add(1)
+            );
+            balance = IERC20(token).balanceOf(address(this));
+        }
+
+        _liquidatedAmount = Math.min(_amountNeeded, balance);
+        if (_liquidatedAmount > 0) {
+            IERC20(token).transfer(msg.sender, _liquidatedAmount);
+        }
+    }
+
+    // LP tokens of a position that need to be burnt to get _amount of _token
+    function lpForAmount(
+        uint256 _index,
+        address _token,
+        uint256 _amount
+    ) public view returns (uint256) {
+        address pair = positions[_index].pair;
+        uint256 reserve = IERC20(_token).balanceOf(pair);
+        if (reserve == 0) {
+            return 0;
+        }
+        return _amount.mul(IERC20(pair).totalSupply()).div(reserve);
+    }
+
+    function distributeProfit() internal {
+        uint256 balanceA = balanceOfA();
+        if (balanceA > 0) {
+            IERC20(tokenA).transfer(providerA, balanceA);
+        }
+
+        uint256 balanceB = balanceOfB();
+        if (balanceB > 0) {
+            IERC20(tokenB).transfer(providerB, balanceB);
+        }
+    }
+
+    // Value in tokenA of a position, both sides of the LP are worth the same
+    function positionValue(uint256 _index) public view returns (uint256) {
+        address pair = positions[_index].pair;
+        uint256 supply = IERC20(pair).totalSupply();
+        if (supply == 0) {
+            return 0;
+        }
+        return
+            balanceOfLP(_index)
+                .mul(IERC20(tokenA).balanceOf(pair))
+                .mul(2)
+                .div(supply);
+    }
+
+    // Value in tokenA of the idle tokens, tokenB is priced with the first
+    // position's pair
+    function idleValue() public view returns (uint256) {
+        uint256 value = balanceOfA();
+        if (positions.length == 0) {
+            return value;
+        }
+
+        address pair = positions[0].pair;
+        uint256 reserveB = IERC20(tokenB).balanceOf(pair);
+        if (reserveB == 0) {
+            return value;
+        }
+        return
+            value.add(
+                balanceOfB().mul(IERC20(tokenA).balanceOf(pair)).div(reserveB)
+            );
+    }
+
+    function numPositions() external view returns (uint256) {
+        return positions.length;
+    }
+
+    function balanceOfPair(uint256 _index) public view returns (uint256) {
+        return IERC20(positions[_index].pair).balanceOf(address(this));
+    }
+
+    function balanceOfStake(uint256 _index) public view returns (uint256) {
+        return _balanceOfStake(positions[_index]);
+    }
+
+    function _balanceOfStake(Position memory _position)
+        internal
+        view
+        returns (uint256)
+    {
+        return
+            _position.masterchef.userInfo(_position.pid, address(this)).amount;
+    }
+
+    function balanceOfLP(uint256 _index) public view returns (uint256) {
+        return balanceOfPair(_index).add(balanceOfStake(_index));
+    }
+
+    function balanceOfA() public view returns (uint256) {
+        return IERC20(tokenA).balanceOf(address(this));
+    }
+
+    function balanceOfB() public view returns (uint256) {
+        return IERC20(tokenB).balanceOf(address(this));
+    }
+
+    function setRatio(uint256 _ratio) external onlyGovOrStrategist {
+        require(_ratio <= MAX_RATIO);
+        ratio = _ratio;
+    }
+
+    function setRebalanceThreshold(uint256 _rebalanceThreshold)
+        external
+        onlyGovOrStrategist
+    {
+        require(_rebalanceThreshold <= MAX_BPS);
+        rebalanceThreshold = _rebalanceThreshold;
+    }
+
+    function setReinvest(bool _reinvest) external onlyGovOrStrategist {
+        reinvest = _reinvest;
+    }
+
+    function setProviderA(address _providerA) external onlyGov {
+        providerA = _providerA;
+    }
+
+    function setProviderB(address _providerB) external onlyGov {
+        providerB = _providerB;
+    }
+
+    function setStrategist(address _strategist) external onlyGov {
+        strategist = _strategist;
+    }
+
+    function setKeeper(address _keeper) external onlyGovOrStrategist {
+        keeper = _keeper;
+    }
+
+    function setPendingGovernance(address _pendingGovernance) external onlyGov {
+        pendingGovernance = _pendingGovernance;
+    }
+
+    function acceptGovernor() external {
+        require(msg.sender == pendingGovernance);
+        governance = pendingGovernance;
+        pendingGovernance = address(0);
+    }
+}
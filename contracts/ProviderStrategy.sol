@@ -19,6 +19,12 @@ interface IERC20Extended {
     function symbol() external view returns (string memory);
 }
 
+interface JointAPI {
+    function liquidateForProvider(uint256 _amountNeeded)
+        external
+        returns (uint256);
+}
+
 contract ProviderStrategy is BaseStrategy {
     using SafeERC20 for IERC20;
     using Address for address;
@@ -171,6 +177,18 @@ contract ProviderStrategy is BaseStrategy {
         returns (uint256 _liquidatedAmount, uint256 _loss)
     {
         uint256 totalAssets = want.balanceOf(address(this));
+        if (_amountNeeded > totalAssets && joint != address(0)) {
+            // Ask the joint for the missing want instead of unwinding it all.
+            // Joints without partial liquidation should not block withdrawals
+            try
+                JointAPI(joint).liquidateForProvider(
+                    _amountNeeded.sub(totalAssets)
+                )
+            returns (uint256) {
+                totalAssets = want.balanceOf(address(this));
+            } catch {}
+        }
+
         if (_amountNeeded > totalAssets) {
             _liquidatedAmount = totalAssets;
             _loss = _amountNeeded.sub(totalAssets);
@@ -20,8 +20,20 @@ interface IMasterchef {
 
     function withdraw(uint256 _pid, uint256 _amount) external;
 
+    function emergencyWithdraw(uint256 _pid) external;
+
     function userInfo(uint256, address) external view returns (UserInfo memory);
 
+    function poolLength() external view returns (uint256);
+
+    function totalAllocPoint() external view returns (uint256);
+
+    function icePerSecond() external view returns (uint256);
+
+    function booPerSecond() external view returns (uint256);
+
+    function cakePerBlock() external view returns (uint256);
+
     function poolInfo(uint256) external view returns (PoolInfo memory);
 
     function pendingIce(uint256 _pid, address _user)
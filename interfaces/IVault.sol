@@ -0,0 +1,88 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+// Subset of the yearn Vault (0.3.4) used by the scripts and tests
+interface IVault {
+    struct StrategyParams {
+        uint256 performanceFee;
+        uint256 activation;
+        uint256 debtRatio;
+        uint256 minDebtPerHarvest;
+        uint256 maxDebtPerHarvest;
+        uint256 lastReport;
+        uint256 totalDebt;
+        uint256 totalGain;
+        uint256 totalLoss;
+    }
+
+    function name() external view returns (string memory);
+
+    function symbol() external view returns (string memory);
+
+    function decimals() external view returns (uint256);
+
+    function apiVersion() external pure returns (string memory);
+
+    function token() external view returns (address);
+
+    function governance() external view returns (address);
+
+    function strategies(address _strategy)
+        external
+        view
+        returns (StrategyParams memory);
+
+    function withdrawalQueue(uint256 _index) external view returns (address);
+
+    function pricePerShare() external view returns (uint256);
+
+    function totalAssets() external view returns (uint256);
+
+    function totalDebt() external view returns (uint256);
+
+    function debtRatio() external view returns (uint256);
+
+    function totalSupply() external view returns (uint256);
+
+    function balanceOf(address _account) external view returns (uint256);
+
+    function creditAvailable(address _strategy) external view returns (uint256);
+
+    function debtOutstanding(address _strategy) external view returns (uint256);
+
+    function deposit() external returns (uint256);
+
+    function deposit(uint256 _amount) external returns (uint256);
+
+    function withdraw() external returns (uint256);
+
+    function withdraw(uint256 _shares) external returns (uint256);
+
+    function withdraw(
+        uint256 _shares,
+        address _recipient,
+        uint256 _maxLoss
+    ) external returns (uint256);
+
+    function addStrategy(
+        address _strategy,
+        uint256 _debtRatio,
+        uint256 _minDebtPerHarvest,
+        uint256 _maxDebtPerHarvest,
+        uint256 _performanceFee
+    ) external;
+
+    function updateStrategyDebtRatio(address _strategy, uint256 _debtRatio)
+        external;
+
+    function updateStrategyMinDebtPerHarvest(
+        address _strategy,
+        uint256 _minDebtPerHarvest
+    ) external;
+
+    function updateStrategyMaxDebtPerHarvest(
+        address _strategy,
+        uint256 _maxDebtPerHarvest
+    ) external;
+}
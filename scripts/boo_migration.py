@@ -1,20 +1,23 @@
-from brownie import Contract, Wei, chain, accounts
+from brownie import Wei, chain, accounts
 import click
 from pycoingecko import CoinGeckoAPI
 
+from scripts.registry import get_registry
+
 
 def main():
+    registry = get_registry()
     # gov = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
     # print(f"You are using: 'gov' [{gov}]")
     gov = accounts.at("0xC27DdC26F48724AD90E4d152940e4981af7Ed50d", force=True)
-    providerA = Contract("0x572E2248841b6DB05b0303A243Dbb475d7010B0c")
-    providerB = Contract("0x0Dbb0D0586CD7705636b820170811FE1378AB8dA")
-    joint = Contract("0x3bE77c7707666a8656bD49D91B875F28cb803471")
-    vaultA = Contract("0x36e7aF39b921235c4b01508BE38F27A535851a5c")
-    vaultB = Contract("0x1E9eC284BA99E14436f809291eBF7dC8CCDB12e1")
-    ftm = Contract("0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83")
-    fusdt = Contract("0x049d68029688eAbF473097a2fC38ef61633A3C7A")
-    boo = Contract("0x841FAD6EAe12c286d1Fd18d1d525DFfA75C7EFFE")
+    providerA = registry.provider_wftm_boo
+    providerB = registry.provider_fusdt_boo
+    joint = registry.joint_wftm_fusdt
+    vaultA = registry.vault_wftm
+    vaultB = registry.vault_fusdt
+    ftm = registry.wftm
+    fusdt = registry.fusdt
+    boo = registry.boo
     ftm_capital = Wei(
         "12_364.532347266988 ether"
     )  # actualizar en cada iteracion - (26/04) 0xc5bc135e95655fb0601fbd1d63723c5a71140438e959d75bf29664be00851e79
@@ -52,8 +55,8 @@ def main():
         print(f"Pending reward: {joint.pendingReward()/1e18} boo")
         print(f"ftm avail in joint {joint.balanceOfA()/1e18}")
         print(f"fusdt avail in joint {joint.balanceOfB()/1e6}")
-        print(f"ftm avail in ProviderA {providerA.balanceOf()/1e18}")
-        print(f"fusdt avail in ProviderB {providerB.balanceOf()/1e6}")
+        print(f"ftm avail in ProviderA {providerA.balanceOfWant()/1e18}")
+        print(f"fusdt avail in ProviderB {providerB.balanceOfWant()/1e6}")
         print(
             f"ftm profit {ftm_profit} in providerA with usd value of {ftm_profit_usd}"
         )
@@ -86,9 +89,9 @@ def main():
         print(f"Pending reward: {joint.pendingReward()/1e18} boo")
         print(f"ftm avail in joint {joint.balanceOfA()/1e18}")
         print(f"fusdt avail in joint {joint.balanceOfB()/1e6}")
-        print(f"ftm avail in ProviderA {providerA.balanceOf()/1e18}")
+        print(f"ftm avail in ProviderA {providerA.balanceOfWant()/1e18}")
 
-        print(f"fusdt avail in ProviderB {providerB.balanceOf()/1e6}")
+        print(f"fusdt avail in ProviderB {providerB.balanceOfWant()/1e6}")
         print(
             f"ftm profit {ftm_profit} in providerA with usd value of {ftm_profit_usd}"
         )
@@ -0,0 +1,238 @@
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+from brownie import chain, web3
+from eth_utils import keccak
+
+from scripts.registry import get_registry
+
+HARVESTED_TOPIC = "0x" + keccak(text="Harvested(uint256,uint256,uint256,uint256)").hex()
+LOG_LOOKBACK = 10_000
+POLL_INTERVAL = 1
+
+# StrategyParams fields returned by vault.strategies()
+LAST_REPORT = 5
+TOTAL_GAIN = 7
+TOTAL_LOSS = 8
+
+
+class JointTarget:
+    """
+    Everything that does not change between blocks for one joint: providers,
+    vaults, tokens and pair are resolved once when the exporter starts.
+    """
+
+    def __init__(self, registry, joint, name):
+        self.name = name
+        self.joint = joint
+        self.tokenA = registry.at(self.joint.tokenA(), "IERC20Detailed")
+        self.tokenB = registry.at(self.joint.tokenB(), "IERC20Detailed")
+        self.reward = registry.at(self.joint.reward(), "IERC20Detailed")
+        self.pair = registry.at(self.joint.getPair(), "IERC20Detailed")
+        self.providers = {
+            "A": registry.at(self.joint.providerA(), "ProviderStrategy"),
+            "B": registry.at(self.joint.providerB(), "ProviderStrategy"),
+        }
+        self.vaults = {
+            side: registry.at(provider.vault(), "IVault")
+            for side, provider in self.providers.items()
+        }
+        self.decimals = {
+            "A": 10 ** self.tokenA.decimals(),
+            "B": 10 ** self.tokenB.decimals(),
+            "reward": 10 ** self.reward.decimals(),
+            "pair": 10 ** self.pair.decimals(),
+        }
+
+
+class Exporter:
+    """
+    Reads the state of every joint once per block through a single multicall
+    and keeps the latest samples in Prometheus text format.
+    """
+
+    def __init__(self, registry, targets):
+        self.registry = registry
+        self.targets = targets
+        self.last_block = None
+        self.harvests = {}
+        self._log_block = None
+        self._text = ""
+        self._lock = Lock()
+
+    def _read(self):
+        reads = []
+        with self.registry.multicall():
+            for t in self.targets:
+                j = t.joint
+                reads.append(
+                    {
+                        "balanceA": j.balanceOfA(),
+                        "balanceB": j.balanceOfB(),
+                        "balanceReward": j.balanceOfReward(),
+                        "pair": j.balanceOfPair(),
+                        "stake": j.balanceOfStake(),
+                        "pendingReward": j.pendingReward(),
+                        "reserveA": t.tokenA.balanceOf(t.pair),
+                        "reserveB": t.tokenB.balanceOf(t.pair),
+                        "supply": t.pair.totalSupply(),
+                        "want": {s: p.balanceOfWant() for s, p in t.providers.items()},
+                        "params": {
+                            s: t.vaults[s].strategies(p) for s, p in t.providers.items()
+                        },
+                        "pps": {s: v.pricePerShare() for s, v in t.vaults.items()},
+                    }
+                )
+        return reads
+
+    def _update_harvests(self, block):
+        # Only new blocks are scanned for Harvested, receipts are fetched
+        # once per harvest to get its gas
+        providers = [p.address for t in self.targets for p in t.providers.values()]
+        from_block = (
+            max(block - LOG_LOOKBACK, 0)
+            if self._log_block is None
+            else self._log_block + 1
+        )
+        if from_block > block:
+            return
+        logs = web3.eth.get_logs(
+            {
+                "address": providers,
+                "fromBlock": from_block,
+                "toBlock": block,
+                "topics": [HARVESTED_TOPIC],
+            }
+        )
+        for log in logs:
+            receipt = web3.eth.get_transaction_receipt(log["transactionHash"])
+            self.harvests[log["address"]] = receipt["gasUsed"]
+        self._log_block = block
+
+    def refresh(self):
+        block = web3.eth.block_number
+        if block == self.last_block:
+            return False
+
+        reads = self._read()
+        self._update_harvests(block)
+        now = chain[block].timestamp
+
+        samples = []
+        for t, r in zip(self.targets, reads):
+            labels = {"joint": t.name}
+            dA, dB = t.decimals["A"], t.decimals["B"]
+            lp = r["pair"] + r["stake"]
+            # Value in tokenA of LP, idle balances at current reserves
+            value = r["balanceA"] / dA
+            if r["supply"] > 0 and r["reserveB"] > 0:
+                priceB = (r["reserveA"] / dA) / (r["reserveB"] / dB)
+                value += 2 * lp * r["reserveA"] / r["supply"] / dA
+                value += r["balanceB"] / dB * priceB
+
+            samples += [
+                ("joint_balance_a", labels, r["balanceA"] / dA),
+                ("joint_balance_b", labels, r["balanceB"] / dB),
+                (
+                    "joint_balance_reward",
+                    labels,
+                    r["balanceReward"] / t.decimals["reward"],
+                ),
+                ("joint_lp_unstaked", labels, r["pair"] / t.decimals["pair"]),
+                ("joint_lp_staked", labels, r["stake"] / t.decimals["pair"]),
+                (
+                    "joint_pending_reward",
+                    labels,
+                    r["pendingReward"] / t.decimals["reward"],
+                ),
+                ("joint_value_a", labels, value),
+            ]
+            for side, provider in t.providers.items():
+                d = t.decimals[side]
+                plabels = {"joint": t.name, "provider": side}
+                params = r["params"][side]
+                samples += [
+                    ("provider_balance_of_want", plabels, r["want"][side] / d),
+                    ("vault_total_gain", plabels, params[TOTAL_GAIN] / d),
+                    ("vault_total_loss", plabels, params[TOTAL_LOSS] / d),
+                    ("vault_price_per_share", plabels, r["pps"][side] / d),
+                    (
+                        "provider_last_harvest_age_seconds",
+                        plabels,
+                        now - params[LAST_REPORT],
+                    ),
+                ]
+                if provider.address in self.harvests:
+                    samples.append(
+                        (
+                            "provider_last_harvest_gas_used",
+                            plabels,
+                            self.harvests[provider.address],
+                        )
+                    )
+
+        samples.append(("exporter_block", {}, block))
+        text = render(samples)
+        with self._lock:
+            self._text = text
+            self.last_block = block
+        return True
+
+    def metrics(self):
+        with self._lock:
+            return self._text
+
+    def run(self, poll_interval=POLL_INTERVAL):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"refresh failed: {e}")
+            time.sleep(poll_interval)
+
+
+def render(samples):
+    lines = []
+    for name, labels, value in samples:
+        label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        lines.append(
+            f"{name}{{{label_str}}} {float(value)}"
+            if labels
+            else f"{name} {float(value)}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def serve(exporter, port=9100, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = exporter.metrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(port=9100, joints="joint_wftm_ice"):
+    registry = get_registry()
+    targets = [
+        JointTarget(registry, registry[name], name) for name in joints.split(",")
+    ]
+
+    exporter = Exporter(registry, targets)
+    exporter.refresh()
+    serve(exporter, int(port))
+    print(f"Serving metrics for {joints} on http://127.0.0.1:{port}/metrics")
+    exporter.run()
@@ -0,0 +1,101 @@
+from scripts.registry import get_registry, unwrap
+
+MAX_BPS = 10_000
+
+# StrategyParams fields returned by vault.strategies()
+DEBT_RATIO = 2
+TOTAL_DEBT = 6
+
+
+def balanced_amounts(reserveA, reserveB, availableA, availableB, idleA=0, idleB=0):
+    # Same math as Joint.balancedAmounts: the largest amounts out of what is
+    # available that, added to the idle balances, match the pool ratio
+    if reserveA == 0 or reserveB == 0:
+        return availableA, availableB
+
+    totalA, totalB = idleA + availableA, idleB + availableB
+    if totalA * reserveB > totalB * reserveA:
+        neededA = totalB * reserveA // reserveB
+        return max(neededA - idleA, 0), availableB
+    neededB = totalA * reserveB // reserveA
+    return availableA, max(neededB - idleB, 0)
+
+
+def credit(params, vault_assets, vault_debt_ratio, vault_debt, vault_idle):
+    # What the vault would lend the strategy ignoring maxDebtPerHarvest,
+    # following Vault.creditAvailable
+    strategy_limit = params[DEBT_RATIO] * vault_assets // MAX_BPS
+    vault_limit = vault_debt_ratio * vault_assets // MAX_BPS
+    available = min(
+        strategy_limit - params[TOTAL_DEBT], vault_limit - vault_debt, vault_idle
+    )
+    return max(available, 0)
+
+
+def debt_limits(joint, registry=None, max_amountA=None, max_amountB=None):
+    """
+    maxDebtPerHarvest for both providers so that what they send to the joint
+    on their next harvest, plus what the joint already holds, is in the pool
+    ratio and gets fully deployed by the first createLP. max_amountA and
+    max_amountB optionally cap how much each side sends.
+    """
+    registry = registry or get_registry()
+    providers = [
+        registry.at(joint.providerA(), "ProviderStrategy"),
+        registry.at(joint.providerB(), "ProviderStrategy"),
+    ]
+    vaults = [registry.at(p.vault(), "IVault") for p in providers]
+    tokens = [
+        registry.at(joint.tokenA(), "IERC20Detailed"),
+        registry.at(joint.tokenB(), "IERC20Detailed"),
+    ]
+    pair = joint.getPair()
+
+    with registry.multicall():
+        reserves = [t.balanceOf(pair) for t in tokens]
+        # Joints deployed before the reward threshold have no capitalOf
+        idle = [(joint.capitalOf(t), t.balanceOf(joint)) for t in tokens]
+        want = [p.balanceOfWant() for p in providers]
+        vault_reads = [
+            (
+                v.strategies(p),
+                v.totalAssets(),
+                v.debtRatio(),
+                v.totalDebt(),
+                t.balanceOf(v),
+            )
+            for v, p, t in zip(vaults, providers, tokens)
+        ]
+
+    idle = [
+        capital if unwrap(capital) is not None else balance for capital, balance in idle
+    ]
+    reserves, idle, want = (
+        [int(unwrap(r)) for r in reads] for reads in (reserves, idle, want)
+    )
+    vault_reads = [
+        (unwrap(params), *(int(unwrap(r)) for r in rest))
+        for params, *rest in vault_reads
+    ]
+
+    available = [w + credit(*reads) for w, reads in zip(want, vault_reads)]
+    for i, cap in enumerate((max_amountA, max_amountB)):
+        if cap is not None:
+            available[i] = min(available[i], cap)
+
+    amountA, amountB = balanced_amounts(*reserves, *available, *idle)
+    # Want already in the providers is sent whatever the debt limit
+    return {
+        "amountA": amountA,
+        "amountB": amountB,
+        "maxDebtPerHarvestA": max(amountA - want[0], 0),
+        "maxDebtPerHarvestB": max(amountB - want[1], 0),
+    }
+
+
+def main(joint_name="joint_wftm_ice"):
+    registry = get_registry()
+    joint = registry[joint_name]
+    limits = debt_limits(joint, registry)
+    for key, value in limits.items():
+        print(f"{key}: {value}")
@@ -1,12 +1,15 @@
-from brownie import Contract, Wei, chain, accounts
+from brownie import Wei, chain, accounts
 import click
 
+from scripts.registry import get_registry
+
 
 def main():
+    registry = get_registry()
 
-    providerB = Contract("0xF878E59600124ca46a30193A3F76EDAc99591698")
-    old_joint = Contract(providerB.joint())
-    providerA = Contract(old_joint.providerA())
+    providerB = registry.provider_ice
+    old_joint = registry.at(providerB.joint(), "Joint")
+    providerA = registry.at(old_joint.providerA(), "ProviderStrategy")
 
     gov = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
     old_joint.harvest({"from": gov, "gas_price": "1 gwei"})
@@ -19,7 +22,7 @@ def main():
     assert old_joint.balanceOfB() + old_joint.balanceOfA() == 0
     assert old_joint.balanceOfStake() == 0
 
-    new_joint = Contract("0x201b41f69a4870323d8c9118e1d1b979939f8d45")
+    new_joint = registry.at("0x201b41f69a4870323d8c9118e1d1b979939f8d45", "Joint")
 
     providerA.setJoint(new_joint, {"from": gov, "gas_price": "1 gwei"})
     providerB.setJoint(new_joint, {"from": gov, "gas_price": "1 gwei"})
@@ -29,11 +32,11 @@ def main():
     assert providerA.takeProfit() == False
     assert providerB.takeProfit() == False
 
-    vaultA = Contract(providerA.vault())
+    vaultA = registry.at(providerA.vault(), "IVault")
     vaultA.updateStrategyMaxDebtPerHarvest(
         providerA, 0, {"from": gov, "gas_price": "1 gwei"}
     )
-    vaultB = Contract(providerB.vault())
+    vaultB = registry.at(providerB.vault(), "IVault")
     vaultB.updateStrategyMaxDebtPerHarvest(
         providerB, 0, {"from": gov, "gas_price": "1 gwei"}
     )
@@ -1,16 +1,19 @@
-from brownie import Contract, Wei, chain, accounts
+from brownie import Wei, chain, accounts
 import click
 
+from scripts.registry import get_registry
+
 
 def main():
-    providerB = Contract("0xF878E59600124ca46a30193A3F76EDAc99591698")
-    old_joint = Contract(providerB.joint())
-    providerA = Contract(old_joint.providerA())
+    registry = get_registry()
+    providerB = registry.provider_ice
+    old_joint = registry.at(providerB.joint(), "Joint")
+    providerA = registry.at(old_joint.providerA(), "ProviderStrategy")
 
     # gov = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
     gov = old_joint.governance()
 
-    new_joint = Contract("0x3F770158A92Fb7649ffce4313F8b6B1B1941ad9c")
+    new_joint = registry.joint_wftm_ice
     old_joint.setProviderA(new_joint, {"from": gov, "gas_price": "1 gwei"})
     old_joint.setProviderB(new_joint, {"from": gov, "gas_price": "1 gwei"})
     old_joint.liquidatePosition({"from": gov, "gas_price": "1 gwei"})
@@ -61,8 +64,8 @@ def main():
     new_joint.harvest({"from": gov, "gas_price": "1 gwei"})
 
     # Providers state
-    vaultA = Contract(providerA.vault())
-    vaultB = Contract(providerB.vault())
+    vaultA = registry.at(providerA.vault(), "IVault")
+    vaultB = registry.at(providerB.vault(), "IVault")
 
     profitA_before = vaultA.strategies(providerA).dict()["totalGain"]
     profitB_before = vaultB.strategies(providerB).dict()["totalGain"]
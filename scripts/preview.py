@@ -0,0 +1,339 @@
+from itertools import combinations
+
+from brownie import ZERO_ADDRESS
+
+from scripts.registry import get_registry, unwrap
+
+# Swap fee of each router, in bps
+ROUTER_FEES = {"router_sushi": 30, "router_spooky": 20, "router_pancake": 25}
+DEFAULT_FEE = 30
+MAX_RATIO = 1000
+
+# StrategyParams field returned by vault.strategies()
+TOTAL_DEBT = 6
+
+
+class Pool:
+    """Constant product pool with the same integer math as UniswapV2."""
+
+    def __init__(self, token0, token1, reserve0, reserve1, supply, fee):
+        self.reserves = {token0: reserve0, token1: reserve1}
+        self.supply = supply
+        self.fee = fee
+
+    def get_amount_out(self, token_in, token_out, amount_in):
+        reserve_in, reserve_out = self.reserves[token_in], self.reserves[token_out]
+        amount_in_with_fee = amount_in * (10_000 - self.fee)
+        return (
+            amount_in_with_fee
+            * reserve_out
+            // (reserve_in * 10_000 + amount_in_with_fee)
+        )
+
+    def swap(self, token_in, token_out, amount_in):
+        amount_out = self.get_amount_out(token_in, token_out, amount_in)
+        self.reserves[token_in] += amount_in
+        self.reserves[token_out] -= amount_out
+        return amount_out
+
+
+class JointPreview:
+    """
+    Local model of a Joint, loaded from one block of chain state. Methods
+    mirror the contract so a sequence of calls can be previewed without
+    sending transactions or running a fork.
+    """
+
+    def __init__(self, state):
+        self.__dict__.update(state)
+        self.swaps = []
+        self.distributed = {self.tokenA: 0, self.tokenB: 0}
+
+    def balance(self, token):
+        return self.balances.get(token, 0)
+
+    def capital(self, token):
+        # Carried rewards are not capital
+        balance = self.balance(token)
+        if token != self.reward:
+            return balance
+        return balance - min(self.carriedReward, balance)
+
+    def reward_value(self, amount):
+        if self.reward == self.tokenA:
+            return amount
+        reserves = self._pair().reserves
+        reserve = reserves.get(self.reward, 0)
+        return amount * reserves[self.tokenA] // reserve if reserve else 0
+
+    def is_reward_above_min(self, amount):
+        return (
+            amount > 0
+            and amount >= self.minRewardToSell
+            and self.reward_value(amount) >= self.minRewardValue
+        )
+
+    def _pair(self):
+        return self.pools[frozenset((self.tokenA, self.tokenB))]
+
+    def _swap(self, token_in, token_out, amount):
+        if token_in == self.WETH or token_out == self.WETH:
+            path = [token_in, token_out]
+        else:
+            path = [token_in, self.WETH, token_out]
+
+        self.balances[token_in] = self.balance(token_in) - amount
+        if self.balances[token_in] < 0:
+            raise ValueError(f"Not enough {token_in} to swap")
+
+        amount_out = amount
+        for hop_in, hop_out in zip(path, path[1:]):
+            pool = self.pools.get(frozenset((hop_in, hop_out)))
+            if pool is None:
+                raise ValueError(f"No pool for {hop_in}/{hop_out}")
+            amount_out = pool.swap(hop_in, hop_out, amount_out)
+
+        self.balances[token_out] = self.balance(token_out) + amount_out
+        self.swaps.append((token_in, token_out, amount, amount_out))
+        return amount_out
+
+    def _claim(self):
+        # Depositing or withdrawing from the masterchef pays pending rewards
+        self.balances[self.reward] = self.balance(self.reward) + self.pending
+        claimed, self.pending = self.pending, 0
+        return claimed
+
+    def harvest(self):
+        # Without reinvest the minimum is ignored, as in Joint.harvest
+        carried = min(self.carriedReward, self.balance(self.reward))
+        sell = (
+            not self.reinvest
+            or (self.minRewardToSell == 0 and self.minRewardValue == 0)
+            or self.is_reward_above_min(carried + self.pending)
+        )
+
+        if sell:
+            reward_profit = self._claim() + carried
+            self.carriedReward = 0
+            if reward_profit > 0 and self.ratio > 0:
+                if self.reward not in (self.tokenA, self.tokenB):
+                    raise ValueError("!swapTo")
+                swap_to = self.tokenB if self.reward == self.tokenA else self.tokenA
+                self._swap(
+                    self.reward, swap_to, reward_profit * self.ratio // MAX_RATIO
+                )
+        else:
+            self.carriedReward = carried
+
+        if self.capital(self.tokenA) == 0 and self.capital(self.tokenB) == 0:
+            return
+
+        if self.reinvest:
+            self.create_lp()
+            self.deposit_lp()
+        else:
+            self.distribute_profit()
+
+    def create_lp(self):
+        pair = self._pair()
+        reserveA, reserveB = pair.reserves[self.tokenA], pair.reserves[self.tokenB]
+        amountA, amountB = self.capital(self.tokenA), self.capital(self.tokenB)
+        if amountA == 0 or amountB == 0:
+            return
+
+        # Router.addLiquidity only takes the amounts that match the pool ratio
+        optimalB = amountA * reserveB // reserveA
+        if optimalB <= amountB:
+            amountB = optimalB
+        else:
+            amountA = amountB * reserveA // reserveB
+
+        liquidity = min(
+            amountA * pair.supply // reserveA, amountB * pair.supply // reserveB
+        )
+        pair.reserves[self.tokenA] += amountA
+        pair.reserves[self.tokenB] += amountB
+        pair.supply += liquidity
+        self.balances[self.tokenA] -= amountA
+        self.balances[self.tokenB] -= amountB
+        self.lp += liquidity
+
+    def deposit_lp(self):
+        if self.lp > 0:
+            self.carriedReward += self._claim()
+            self.stake += self.lp
+            self.lp = 0
+
+    def liquidate_position(self):
+        self._claim()
+        self.lp += self.stake
+        self.stake = 0
+
+        pair = self._pair()
+        for token in (self.tokenA, self.tokenB):
+            amount = self.lp * pair.reserves[token] // pair.supply
+            pair.reserves[token] -= amount
+            self.balances[token] = self.balance(token) + amount
+        pair.supply -= self.lp
+        self.lp = 0
+
+    def sell_capital(self, token_from, token_to, amount):
+        return self._swap(token_from, token_to, amount)
+
+    def distribute_profit(self):
+        self.carriedReward = 0
+        for token in (self.tokenA, self.tokenB):
+            self.distributed[token] += self.balance(token)
+            self.balances[token] = 0
+
+    def result(self):
+        profit = {}
+        for side, token in (("A", self.tokenA), ("B", self.tokenB)):
+            provider = self.providers[side]
+            profit[side] = (
+                self.distributed[token] + provider["want"] - provider["totalDebt"]
+            )
+
+        return {
+            "balanceA": self.balance(self.tokenA),
+            "balanceB": self.balance(self.tokenB),
+            "balanceReward": self.balance(self.reward),
+            "carriedReward": self.carriedReward,
+            "balanceOfPair": self.lp,
+            "balanceOfStake": self.stake,
+            "swaps": self.swaps,
+            "distributedA": self.distributed[self.tokenA],
+            "distributedB": self.distributed[self.tokenB],
+            "profitA": profit["A"],
+            "profitB": profit["B"],
+        }
+
+
+def _router_fee(registry, router):
+    for name, fee in ROUTER_FEES.items():
+        if name in registry and registry.address(name).lower() == router.lower():
+            return fee
+    return DEFAULT_FEE
+
+
+def load(joint, registry=None, fee=None):
+    # Four batched reads: the joint, its router factory and provider vaults,
+    # the pairs between its tokens, then the reserves of those pairs
+    # together with the providers
+    registry = registry or get_registry()
+    with registry.multicall():
+        tokenA, tokenB = joint.tokenA(), joint.tokenB()
+        reward, WETH, router = joint.reward(), joint.WETH(), joint.router()
+        providerA, providerB = joint.providerA(), joint.providerB()
+        balances = {
+            "A": joint.balanceOfA(),
+            "B": joint.balanceOfB(),
+            "reward": joint.balanceOfReward(),
+        }
+        lp, stake = joint.balanceOfPair(), joint.balanceOfStake()
+        pending = joint.pendingReward()
+        # BooJoint and CakeJoint have no ratio nor reinvest
+        ratio = joint.ratio() if hasattr(joint, "ratio") else 0
+        reinvest = joint.reinvest() if hasattr(joint, "reinvest") else False
+        # Joints without a reward threshold sell every batch. Deployed joints
+        # built with the current ABI revert and read as None
+        if hasattr(joint, "carriedReward"):
+            threshold = (
+                joint.minRewardToSell(),
+                joint.minRewardValue(),
+                joint.carriedReward(),
+            )
+        else:
+            threshold = (None, None, None)
+
+    providers = {
+        "A": registry.at(str(providerA), "ProviderStrategy"),
+        "B": registry.at(str(providerB), "ProviderStrategy"),
+    }
+    with registry.multicall():
+        factory = registry.at(str(router), "IUniswapV2Router02").factory()
+        vaults = {s: p.vault() for s, p in providers.items()}
+
+    factory = registry.at(str(factory), "IUniswapV2Factory")
+    vaults = {s: registry.at(str(v), "IVault") for s, v in vaults.items()}
+    tokens = {str(t) for t in (tokenA, tokenB, reward, WETH)}
+    with registry.multicall():
+        pairs = {
+            frozenset(pair): factory.getPair(*pair)
+            for pair in combinations(sorted(tokens), 2)
+        }
+
+    fee = _router_fee(registry, str(router)) if fee is None else fee
+    pairs = {
+        k: registry.at(v, "IUniswapV2Pair")
+        for k, v in pairs.items()
+        if v != ZERO_ADDRESS
+    }
+    with registry.multicall():
+        reads = {
+            k: (p.token0(), p.token1(), p.getReserves(), p.totalSupply())
+            for k, p in pairs.items()
+        }
+        provider_reads = {
+            s: (p.balanceOfWant(), vaults[s].strategies(p))
+            for s, p in providers.items()
+        }
+
+    pools = {
+        k: Pool(str(t0), str(t1), int(reserves[0]), int(reserves[1]), int(supply), fee)
+        for k, (t0, t1, reserves, supply) in reads.items()
+    }
+    state = {
+        "tokenA": str(tokenA),
+        "tokenB": str(tokenB),
+        "reward": str(reward),
+        "WETH": str(WETH),
+        "balances": {},
+        "lp": int(lp),
+        "stake": int(stake),
+        "pending": int(pending),
+        "ratio": int(ratio),
+        "reinvest": bool(reinvest),
+        "minRewardToSell": int(unwrap(threshold[0]) or 0),
+        "minRewardValue": int(unwrap(threshold[1]) or 0),
+        "carriedReward": int(unwrap(threshold[2]) or 0),
+        "pools": pools,
+        "providers": {
+            s: {"want": int(want), "totalDebt": int(params[TOTAL_DEBT])}
+            for s, (want, params) in provider_reads.items()
+        },
+    }
+    # The reward can be tokenA or tokenB, don't count it twice
+    state["balances"][str(reward)] = int(balances["reward"])
+    state["balances"][str(tokenA)] = int(balances["A"])
+    state["balances"][str(tokenB)] = int(balances["B"])
+    return JointPreview(state)
+
+
+def preview(joint, actions, registry=None, fee=None):
+    """
+    Preview a sequence of joint actions, e.g.
+    `[("liquidatePosition",), ("sellCapital", tokenB, tokenA, amount),
+    ("distributeProfit",)]`, from the current chain state without sending
+    any transaction. Returns balances, swap outputs and per provider profit
+    versus their vault debt once every action has run.
+    """
+    sim = load(joint, registry, fee)
+    methods = {
+        "harvest": sim.harvest,
+        "liquidatePosition": sim.liquidate_position,
+        "sellCapital": sim.sell_capital,
+        "distributeProfit": sim.distribute_profit,
+        "createLP": sim.create_lp,
+    }
+    for name, *args in actions:
+        methods[name](*(str(a) if hasattr(a, "address") else a for a in args))
+    return sim.result()
+
+
+def main(joint_name="joint_wftm_ice"):
+    registry = get_registry()
+    joint = registry[joint_name]
+    result = preview(joint, [("liquidatePosition",), ("distributeProfit",)], registry)
+    for key, value in result.items():
+        print(f"{key}: {value}")
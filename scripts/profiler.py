@@ -0,0 +1,287 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from importlib import import_module
+from pathlib import Path
+from threading import Lock
+
+from brownie import network, web3
+from brownie.network.contract import ContractCall, ContractTx
+from eth_account.signers.local import LocalAccount
+
+REPORT_PATH = Path(__file__).parent.parent / "reports" / "profiles"
+NO_STEP = "(no step)"
+SLOW_STEPS = 10
+
+# Transaction phase of each RPC method, anything else is reported as is
+PHASES = {
+    "eth_call": "call",
+    "eth_estimateGas": "estimate_gas",
+    "eth_chainId": "prepare",
+    "eth_gasPrice": "prepare",
+    "eth_maxPriorityFeePerGas": "prepare",
+    "eth_getTransactionCount": "prepare",
+    "eth_sendRawTransaction": "send",
+    "eth_sendTransaction": "send",
+    "eth_getTransactionByHash": "confirm",
+    "eth_getTransactionReceipt": "confirm",
+    "debug_traceTransaction": "trace",
+}
+SENDS = ("eth_sendRawTransaction", "eth_sendTransaction")
+
+
+class Profiler:
+    """
+    Times every RPC request, contract call, transaction and signature made
+    while it is active and groups them in steps. Steps are opened with
+    `step(name)`, otherwise each contract call or transaction is its own
+    step. Identical `eth_call` requests with no transaction sent in between
+    are counted as redundant reads.
+
+    Requests are timed at the provider, so cached reads are not counted and
+    any node works, a local chain included.
+    """
+
+    def __init__(self, name="run"):
+        self.name = name
+        self.events = []
+        self.redundant = {}
+        self.started = None
+        self.network = None
+        self._start = None
+        self._steps = []
+        self._actions = []
+        self._reads = {}
+        self._patches = []
+        self._lock = Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _now(self):
+        return time.perf_counter() - self._start
+
+    def _record(self, kind, name, start, **detail):
+        event = {
+            "kind": kind,
+            "name": name,
+            "step": self._steps[-1] if self._steps else NO_STEP,
+            "start": start,
+            "duration": self._now() - start,
+        }
+        event.update(detail)
+        with self._lock:
+            self.events.append(event)
+
+    def _patch(self, target, attr, wrapper):
+        # Instance methods are patched on the instance and deleted on stop
+        own = attr in vars(target)
+        original = getattr(target, attr)
+        self._patches.append((target, attr, original if own else None))
+        setattr(target, attr, wrapper(original))
+
+    def start(self):
+        self.started = datetime.now()
+        self.network = network.show_active()
+        self._start = time.perf_counter()
+
+        provider = web3.provider
+        self._patch(provider, "make_request", self._wrap_request)
+        # Multicall swaps the code of ContractCall.__call__, which a closure
+        # can't take, so calls are timed in ContractCall.call instead. Calls
+        # queued in a multicall block are timed once, in tryAggregate
+        self._patch(ContractCall, "call", self._wrap_action("call"))
+        self._patch(ContractTx, "__call__", self._wrap_action("transaction"))
+        self._patch(LocalAccount, "sign_transaction", self._wrap_sign)
+        # web3 caches the middleware chain built around make_request
+        if hasattr(provider, "_request_func_cache"):
+            provider._request_func_cache = (None, None)
+
+    def stop(self):
+        while self._patches:
+            target, attr, original = self._patches.pop()
+            if original is None:
+                delattr(target, attr)
+            else:
+                setattr(target, attr, original)
+        if hasattr(web3.provider, "_request_func_cache"):
+            web3.provider._request_func_cache = (None, None)
+
+    @contextmanager
+    def step(self, name):
+        self._steps.append(name)
+        start = self._now()
+        try:
+            yield
+        finally:
+            self._steps.pop()
+            self._record("step", name, start)
+
+    def _wrap_request(self, make_request):
+        def wrapper(method, params):
+            start = self._now()
+            try:
+                return make_request(method, params)
+            finally:
+                self._record("rpc", method, start, phase=PHASES.get(method, method))
+                self._count_read(method, params)
+
+        return wrapper
+
+    def _count_read(self, method, params):
+        with self._lock:
+            if method in SENDS:
+                self._reads.clear()
+            if method != "eth_call":
+                return
+            call = params[0]
+            key = json.dumps(
+                [call.get("to"), call.get("data"), params[1:]], default=str
+            )
+            if key in self._reads:
+                label = self._reads[key]
+                self.redundant[label] = self.redundant.get(label, 0) + 1
+            else:
+                self._reads[key] = (
+                    self._actions[-1]
+                    if self._actions
+                    else f"{call.get('to')} {str(call.get('data'))[:10]}"
+                )
+
+    def _wrap_action(self, kind):
+        profiler = self
+
+        def wrap(call):
+            def wrapper(method, *args, **kwargs):
+                name = method._name
+                implicit = not profiler._steps
+                if implicit:
+                    profiler._steps.append(name)
+                profiler._actions.append(name)
+                start = profiler._now()
+                try:
+                    return call(method, *args, **kwargs)
+                finally:
+                    profiler._actions.pop()
+                    profiler._record(kind, name, start)
+                    if implicit:
+                        profiler._steps.pop()
+                        profiler._record("step", name, start)
+
+            return wrapper
+
+        return wrap
+
+    def _wrap_sign(self, sign):
+        profiler = self
+
+        def wrapper(account, *args, **kwargs):
+            start = profiler._now()
+            try:
+                return sign(account, *args, **kwargs)
+            finally:
+                profiler._record("sign", "sign_transaction", start, phase="sign")
+
+        return wrapper
+
+    def report(self):
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e["start"])
+            redundant = dict(self.redundant)
+
+        steps = {}
+        phases = {}
+        for e in events:
+            if e["kind"] == "step":
+                step = steps.setdefault(
+                    e["name"], {"step": e["name"], "count": 0, "duration": 0}
+                )
+                step["count"] += 1
+                step["duration"] += e["duration"]
+            if "phase" not in e:
+                continue
+            for totals in (
+                phases,
+                steps.setdefault(
+                    e["step"], {"step": e["step"], "count": 0, "duration": 0}
+                ).setdefault("phases", {}),
+            ):
+                phase = totals.setdefault(e["phase"], {"count": 0, "duration": 0})
+                phase["count"] += 1
+                phase["duration"] += e["duration"]
+
+        for step in steps.values():
+            step.setdefault("phases", {})
+            step["rpc"] = sum(
+                p["count"] for k, p in step["phases"].items() if k != "sign"
+            )
+
+        return {
+            "name": self.name,
+            "network": self.network,
+            "started": self.started.isoformat(),
+            "duration": max((e["start"] + e["duration"] for e in events), default=0),
+            "rpc": sum(1 for e in events if e["kind"] == "rpc"),
+            "phases": phases,
+            "steps": sorted(steps.values(), key=lambda s: s["duration"], reverse=True),
+            "redundant": sorted(
+                ({"read": k, "extra": v} for k, v in redundant.items()),
+                key=lambda r: r["extra"],
+                reverse=True,
+            ),
+            "timeline": events,
+        }
+
+    def write(self, path=REPORT_PATH):
+        report = self.report()
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        file = path / f"{self.name}-{self.started:%Y%m%d-%H%M%S}.json"
+        with open(file, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        return file
+
+
+def summary(report, top=SLOW_STEPS):
+    lines = [
+        f"{report['name']} on {report['network']}: {report['duration']:.2f}s, "
+        f"{report['rpc']} RPC requests"
+    ]
+    for name, phase in sorted(
+        report["phases"].items(), key=lambda p: p[1]["duration"], reverse=True
+    ):
+        lines.append(f"  {name}: {phase['duration']:.2f}s in {phase['count']}")
+
+    lines.append("Slowest steps:")
+    for step in report["steps"][:top]:
+        lines.append(
+            f"  {step['duration']:8.2f}s  {step['rpc']:5} rpc  "
+            f"x{step['count']}  {step['step']}"
+        )
+
+    if report["redundant"]:
+        lines.append("Redundant reads:")
+        for read in report["redundant"][:top]:
+            lines.append(f"  {read['extra']:5} extra  {read['read']}")
+    return "\n".join(lines)
+
+
+def main(script="joint_migration2", fn="main", *args):
+    """
+    Run another script under the profiler, e.g.
+    `brownie run profiler main boo_migration --network ftm-main-fork`. The
+    report is written to reports/profiles even if the script fails.
+    """
+    target = getattr(import_module(f"scripts.{script}"), fn)
+    profiler = Profiler(script)
+    try:
+        with profiler:
+            target(*args)
+    finally:
+        print(summary(profiler.report()))
+        print(f"Report written to {profiler.write()}")
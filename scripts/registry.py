@@ -0,0 +1,135 @@
+import json
+from pathlib import Path
+
+from brownie import Contract, interface, multicall, network, project
+from brownie.convert import to_address
+from brownie.network.contract import ContractCall
+
+REGISTRY_PATH = Path(__file__).parent.parent / "registry.json"
+REGISTRY_VERSION = 1
+
+
+def _network_key(name: str) -> str:
+    # Forks use the same addresses as the network they fork
+    return name[: -len("-fork")] if name.endswith("-fork") else name
+
+
+def _abi(abi_name: str) -> list:
+    # Contracts of this project first, then the compiled interfaces/ folder.
+    # Both come from local build artifacts, nothing is fetched from explorers
+    for p in project.get_loaded_projects():
+        if abi_name in p:
+            return p[abi_name].abi
+    return getattr(interface, abi_name).abi
+
+
+class Registry:
+    """
+    Local registry of the contracts we operate, read from `registry.json`.
+
+    Contracts are built lazily from local ABIs the first time they are
+    accessed and cached afterwards, so no explorer lookup ever happens.
+    """
+
+    def __init__(self, network_name: str = None, path: Path = REGISTRY_PATH):
+        with open(path) as f:
+            data = json.load(f)
+
+        if data["version"] != REGISTRY_VERSION:
+            raise ValueError(
+                f"Registry version {data['version']} is not supported, "
+                f"expected {REGISTRY_VERSION}"
+            )
+
+        key = _network_key(network_name or network.show_active())
+        self.network = key
+        self._entries = dict(data["networks"].get(key, {}))
+        self._contracts = {}
+        self._abis = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __getitem__(self, name: str) -> Contract:
+        if name not in self._contracts:
+            if name not in self._entries:
+                raise KeyError(f"'{name}' is not registered for {self.network}")
+            entry = self._entries[name]
+            self._contracts[name] = Contract.from_abi(
+                name, entry["address"], self.abi(entry["abi"]), persist=False
+            )
+        return self._contracts[name]
+
+    def __getattr__(self, name: str) -> Contract:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError as e:
+            raise AttributeError(name) from e
+
+    def names(self) -> list:
+        return sorted(self._entries)
+
+    def address(self, name: str) -> str:
+        return to_address(self._entries[name]["address"])
+
+    def abi(self, abi_name: str) -> list:
+        if abi_name not in self._abis:
+            self._abis[abi_name] = _abi(abi_name)
+        return self._abis[abi_name]
+
+    def at(self, address: str, abi_name: str, name: str = None) -> Contract:
+        # Fast path for addresses that are only known at runtime,
+        # e.g. vault.token() or provider.joint()
+        key = (str(address).lower(), abi_name)
+        if key not in self._contracts:
+            self._contracts[key] = Contract.from_abi(
+                name or abi_name, str(address), self.abi(abi_name), persist=False
+            )
+        return self._contracts[key]
+
+    def method(self, address: str, abi_name: str, fn_name: str) -> ContractCall:
+        # A single read bound to address without fetching its code, to batch
+        # the same call over many contracts, e.g. every pair of a masterchef
+        abi = next(
+            i
+            for i in self.abi(abi_name)
+            if i["type"] == "function" and i["name"] == fn_name
+        )
+        return ContractCall(to_address(str(address)), abi, fn_name, None)
+
+    def multicall(self, block_identifier: int = None):
+        # Local chains deploy their own Multicall2, live networks need an entry
+        address = self.address("multicall2") if "multicall2" in self else None
+        return multicall(address=address, block_identifier=block_identifier)
+
+    def register(self, name: str, address: str, abi_name: str) -> Contract:
+        # Contracts deployed during a run, e.g. on a local chain
+        self._entries[name] = {"address": str(address), "abi": abi_name}
+        self._contracts.pop(name, None)
+        return self[name]
+
+
+def unwrap(result):
+    # Multicall results are proxies, failed calls resolve to None
+    while hasattr(result, "__wrapped__"):
+        result = result.__wrapped__
+    return result
+
+
+_registries = {}
+
+
+def get_registry(network_name: str = None) -> Registry:
+    key = _network_key(network_name or network.show_active())
+    if key not in _registries:
+        _registries[key] = Registry(key)
+    return _registries[key]
+
+
+def main():
+    registry = get_registry()
+    print(f"Registry v{REGISTRY_VERSION} for {registry.network}")
+    for name in registry.names():
+        print(f"{name}: {registry.address(name)}")
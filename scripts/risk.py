@@ -0,0 +1,222 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DAYS_PER_YEAR = 365
+CHUNK_SIZE = 5_000
+# Annualized vols of tokenA, tokenB and reward, and their pairwise
+# correlations: tokenA/tokenB, tokenA/reward, tokenB/reward
+VOLS = (0.9, 1.2, 1.5)
+CORRELATIONS = (0.6, 0.5, 0.5)
+
+
+def impermanent_loss(price_ratio):
+    # Value of a 50/50 constant product position relative to holding both
+    # tokens, minus one. price_ratio is (pA / pA0) / (pB / pB0)
+    return 2 * np.sqrt(price_ratio) / (1 + price_ratio) - 1
+
+
+def correlation_matrix(ab, a_reward, b_reward):
+    return ((1, ab, a_reward), (ab, 1, b_reward), (a_reward, b_reward, 1))
+
+
+def _floats(values):
+    # brownie run passes arguments as strings, e.g. "0.9,1.2,1.5"
+    if isinstance(values, str):
+        values = values.split(",")
+    return tuple(float(v) for v in values)
+
+
+def _simulate_chunk(args):
+    (
+        seed,
+        paths,
+        steps,
+        dt,
+        drift,
+        cholesky,
+        vols,
+        reward_apr,
+        emission_cut_rate,
+        emission_cut,
+    ) = args
+    rng = np.random.default_rng(seed)
+
+    # Correlated GBM log returns for tokenA, tokenB and reward
+    shocks = rng.standard_normal((paths, steps, 3)) @ cholesky.T
+    log_returns = (drift - 0.5 * vols ** 2) * dt + vols * np.sqrt(dt) * shocks
+    log_prices = np.cumsum(log_returns, axis=1)
+
+    # Emissions are cut by emission_cut at Poisson distributed times
+    cuts = np.cumsum(rng.random((paths, steps)) < emission_cut_rate * dt, axis=1)
+    emission = (1 - emission_cut) ** cuts
+
+    # Rewards are quoted against tokenA, as is the position value. The joint
+    # earns reward_apr of its starting value at starting prices
+    reward_price = np.exp(log_prices[:, :, 2] - log_prices[:, :, 0])
+    rewards = reward_apr * dt * (emission * reward_price).sum(axis=1)
+
+    ratio = np.exp(log_prices[:, -1, 0] - log_prices[:, -1, 1])
+    il = impermanent_loss(ratio)
+    return il, rewards
+
+
+def simulate(
+    days=30,
+    steps_per_day=1,
+    paths=20_000,
+    vols=VOLS,
+    correlation=correlation_matrix(*CORRELATIONS),
+    drift=(0, 0, 0),
+    reward_apr=0.5,
+    emission_cut_rate=0,
+    emission_cut=0.5,
+    seed=0,
+    processes=1,
+):
+    """
+    Simulate a joint position over `days` and return a dict of arrays, one
+    value per path, expressed as a fraction of the starting position value:
+
+    - `il`: impermanent loss versus holding both tokens (<= 0)
+    - `rewards`: reward income, valued at the simulated reward price
+    - `net`: il + rewards
+
+    Vols, drift and emission_cut_rate are annualized. Paths are simulated in
+    chunks with independent seeds, so results do not depend on `processes`.
+    """
+    steps = days * steps_per_day
+    dt = 1 / (DAYS_PER_YEAR * steps_per_day)
+    vols = np.asarray(vols, dtype=float)
+    cholesky = np.linalg.cholesky(np.asarray(correlation, dtype=float))
+
+    sizes = [CHUNK_SIZE] * (paths // CHUNK_SIZE)
+    if paths % CHUNK_SIZE:
+        sizes.append(paths % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [
+        (
+            s,
+            size,
+            steps,
+            dt,
+            np.asarray(drift, dtype=float),
+            cholesky,
+            vols,
+            reward_apr,
+            emission_cut_rate,
+            emission_cut,
+        )
+        for s, size in zip(seeds, sizes)
+    ]
+
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            results = list(executor.map(_simulate_chunk, chunks))
+    else:
+        results = [_simulate_chunk(chunk) for chunk in chunks]
+
+    il = np.concatenate([r[0] for r in results])
+    rewards = np.concatenate([r[1] for r in results])
+    return {"il": il, "rewards": rewards, "net": il + rewards}
+
+
+def recommend_position(net, max_loss, percentile=5):
+    # Largest position (in the unit of max_loss) whose loss at the given
+    # percentile of net returns stays within max_loss
+    worst = np.percentile(net, percentile)
+    if worst >= 0:
+        return float("inf")
+    return max_loss / -worst
+
+
+def recommend_debt(net, max_loss, priceB, vault_assetsA, vault_assetsB, percentile=5):
+    """
+    Split the recommended position between both providers. Amounts are in
+    tokenA, priceB is the price of tokenB in tokenA. Returns the debt of each
+    provider in its own token and the matching debt ratios in bps.
+    """
+    position = recommend_position(net, max_loss, percentile)
+    debtA = min(position / 2, vault_assetsA)
+    debtB = min(position / 2 / priceB, vault_assetsB)
+
+    # Both sides have to be worth the same to be fully deployed
+    debtA = min(debtA, debtB * priceB)
+    debtB = debtA / priceB
+
+    return {
+        "debtA": int(debtA),
+        "debtB": int(debtB),
+        "debtRatioA": int(10_000 * debtA / vault_assetsA),
+        "debtRatioB": int(10_000 * debtB / vault_assetsB),
+    }
+
+
+def summary(result, percentiles=(1, 5, 25, 50, 75, 95)):
+    return {
+        key: {p: float(np.percentile(values, p)) for p in percentiles}
+        for key, values in result.items()
+    }
+
+
+def main(
+    joint_name="joint_wftm_ice",
+    reward_apr=0.5,
+    max_loss_bps=100,
+    percentile=5,
+    processes=1,
+    vols=VOLS,
+    correlations=CORRELATIONS,
+):
+    # Imported here so worker processes only need numpy.
+    # max_loss_bps is the loss we accept at the percentile, in bps of vaultA.
+    # vols and correlations are comma separated, in the order of VOLS and
+    # CORRELATIONS, e.g. `brownie run risk main joint_wftm_ice 0.8 100 5 1
+    # 0.8,1.1,1.4 0.7,0.5,0.5`
+    from scripts.registry import get_registry
+
+    reward_apr, max_loss_bps = float(reward_apr), float(max_loss_bps)
+    percentile, processes = float(percentile), int(processes)
+    vols, correlations = _floats(vols), _floats(correlations)
+
+    registry = get_registry()
+    joint = registry[joint_name]
+    providerA = registry.at(joint.providerA(), "ProviderStrategy")
+    providerB = registry.at(joint.providerB(), "ProviderStrategy")
+    vaultA = registry.at(providerA.vault(), "IVault")
+    vaultB = registry.at(providerB.vault(), "IVault")
+
+    # Spot price of tokenB in tokenA from the pair reserves
+    pair = joint.getPair()
+    tokenA = registry.at(joint.tokenA(), "IERC20Detailed")
+    tokenB = registry.at(joint.tokenB(), "IERC20Detailed")
+    priceB = tokenA.balanceOf(pair) / tokenB.balanceOf(pair)
+
+    assetsA = vaultA.totalAssets()
+    result = simulate(
+        vols=vols,
+        correlation=correlation_matrix(*correlations),
+        reward_apr=reward_apr,
+        seed=int(joint.address, 16) % 2 ** 32,
+        processes=processes,
+    )
+    debt = recommend_debt(
+        result["net"],
+        max_loss=assetsA * max_loss_bps / 10_000,
+        priceB=priceB,
+        vault_assetsA=assetsA,
+        vault_assetsB=vaultB.totalAssets(),
+        percentile=percentile,
+    )
+
+    for key, values in summary(result).items():
+        print(f"{key}: " + ", ".join(f"p{p}={v:.2%}" for p, v in values.items()))
+    print(f"Recommended debt for {joint.name()} at p{percentile:g}:")
+    print(
+        f"providerA: {debt['debtA']/10**tokenA.decimals()} {tokenA.symbol()} "
+        f"(debtRatio {debt['debtRatioA']})"
+    )
+    print(
+        f"providerB: {debt['debtB']/10**tokenB.decimals()} {tokenB.symbol()} "
+        f"(debtRatio {debt['debtRatioB']})"
+    )
@@ -0,0 +1,191 @@
+from brownie import ZERO_ADDRESS
+
+from scripts.registry import get_registry, unwrap
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+# How each masterchef exposes its emissions and where its pairs live.
+# Emissions per block are converted with the network block time
+CHEFS = {
+    "masterchef_ice": {
+        "emission": "icePerSecond",
+        "block_time": None,
+        "reward": "ice",
+        "router": "router_sushi",
+        "native": "wftm",
+    },
+    "masterchef_spooky": {
+        "emission": "booPerSecond",
+        "block_time": None,
+        "reward": "boo",
+        "router": "router_spooky",
+        "native": "wftm",
+    },
+    "masterchef_pancake": {
+        "emission": "cakePerBlock",
+        "block_time": 3,
+        "reward": "cake",
+        "router": "router_pancake",
+        "native": "wbnb",
+    },
+}
+
+
+def _batch(registry, calls):
+    # One round trip for a list of (address, abi, function, args)
+    with registry.multicall():
+        results = [
+            registry.method(address, abi, fn)(*args) for address, abi, fn, args in calls
+        ]
+    return [unwrap(r) for r in results]
+
+
+def _prices(registry, factory, native, tokens):
+    # Price of each token in native-token wei per token wei, read from the
+    # token/native pair of the chef's own dex
+    tokens = sorted(set(tokens) - {native})
+    pairs = _batch(
+        registry,
+        [(factory, "IUniswapV2Factory", "getPair", (t, native)) for t in tokens],
+    )
+    found = [(t, p) for t, p in zip(tokens, pairs) if p and p != ZERO_ADDRESS]
+    calls = []
+    for _, pair in found:
+        calls += [
+            (pair, "IUniswapV2Pair", "token0", ()),
+            (pair, "IUniswapV2Pair", "getReserves", ()),
+        ]
+    results = _batch(registry, calls)
+
+    prices = {native: 1.0}
+    for i, (token, _) in enumerate(found):
+        token0, reserves = results[2 * i], results[2 * i + 1]
+        if token0 is None or reserves is None:
+            continue
+        reserve_token, reserve_native = (
+            (reserves[0], reserves[1])
+            if token0 == token
+            else (reserves[1], reserves[0])
+        )
+        if reserve_token > 0:
+            prices[token] = reserve_native / reserve_token
+    return prices
+
+
+def scan(chef_name, registry=None, vault_tokens=None):
+    """
+    Read every pool of a registry masterchef and return them ranked by
+    reward APR. Each entry has the pid, LP and tokens, allocPoint, total
+    staked, staked value in native token and APR. When vault_tokens is given,
+    only pools whose two tokens are in it are returned.
+
+    The whole scan takes five batched reads, whatever the number of pools.
+    """
+    registry = registry or get_registry()
+    config = CHEFS[chef_name]
+    chef = registry.address(chef_name)
+    native = registry.address(config["native"])
+    reward = registry.address(config["reward"])
+
+    length, total_alloc, emission, factory = _batch(
+        registry,
+        [
+            (chef, "IMasterchef", "poolLength", ()),
+            (chef, "IMasterchef", "totalAllocPoint", ()),
+            (chef, "IMasterchef", config["emission"], ()),
+            (registry.address(config["router"]), "IUniswapV2Router02", "factory", ()),
+        ],
+    )
+    if config["block_time"]:
+        emission = emission / config["block_time"]
+
+    infos = _batch(
+        registry, [(chef, "IMasterchef", "poolInfo", (pid,)) for pid in range(length)]
+    )
+
+    # Single token pools revert on token0 and are skipped
+    lps = [(pid, info) for pid, info in enumerate(infos) if info is not None]
+    calls = []
+    for _, info in lps:
+        calls += [
+            (info[0], "IUniswapV2Pair", "token0", ()),
+            (info[0], "IUniswapV2Pair", "token1", ()),
+            (info[0], "IUniswapV2Pair", "getReserves", ()),
+            (info[0], "IUniswapV2Pair", "totalSupply", ()),
+            (info[0], "IUniswapV2Pair", "balanceOf", (chef,)),
+        ]
+    results = _batch(registry, calls)
+
+    pools = []
+    for i, (pid, info) in enumerate(lps):
+        token0, token1, reserves, supply, staked = results[5 * i : 5 * i + 5]
+        if None in (token0, token1, reserves, supply) or not supply:
+            continue
+        pools.append(
+            {
+                "pid": pid,
+                "lp": info[0],
+                "allocPoint": info[1],
+                "token0": token0,
+                "token1": token1,
+                "reserves": (reserves[0], reserves[1]),
+                "supply": supply,
+                "staked": staked or 0,
+            }
+        )
+
+    if vault_tokens is not None:
+        vault_tokens = {str(t) for t in vault_tokens}
+        pools = [
+            p
+            for p in pools
+            if p["token0"] in vault_tokens and p["token1"] in vault_tokens
+        ]
+
+    tokens = {reward} | {p["token0"] for p in pools} | {p["token1"] for p in pools}
+    prices = _prices(registry, factory, native, tokens)
+    reward_per_year = emission * SECONDS_PER_YEAR * prices.get(reward, 0)
+
+    for p in pools:
+        # The staked value is priced from whichever side is known, a
+        # balanced pool holds the same value on both sides
+        side_values = [
+            p["reserves"][i] * prices[t]
+            for i, t in enumerate((p["token0"], p["token1"]))
+            if t in prices
+        ]
+        pool_value = 2 * side_values[0] if side_values else 0
+        p["stakedValue"] = pool_value * p["staked"] / p["supply"]
+        share = p["allocPoint"] / total_alloc if total_alloc else 0
+        p["apr"] = reward_per_year * share / p["stakedValue"] if p["stakedValue"] else 0
+
+    return sorted(pools, key=lambda p: p["apr"], reverse=True)
+
+
+def registry_vault_tokens(registry=None):
+    # Tokens of the `vault_*` entries of registry.json for the active network,
+    # None when the network has none, e.g. bsc-main where there are no Yearn
+    # vaults
+    registry = registry or get_registry()
+    vaults = [n for n in registry.names() if n.startswith("vault_")]
+    if not vaults:
+        return None
+    return _batch(
+        registry, [(registry.address(n), "IVault", "token", ()) for n in vaults]
+    )
+
+
+def main(chef_name="masterchef_spooky", top=20):
+    registry = get_registry()
+    vault_tokens = registry_vault_tokens(registry)
+    if vault_tokens is None:
+        print(f"No vaults registered for {registry.network}, listing every pool")
+    else:
+        names = [n for n in registry.names() if n.startswith("vault_")]
+        print(f"Pools whose two tokens have a vault in: {', '.join(names)}")
+    pools = scan(chef_name, registry, vault_tokens)
+    for p in pools[: int(top)]:
+        print(
+            f"pid {p['pid']}: {p['token0']}/{p['token1']} "
+            f"apr {p['apr']:.2%}, staked {p['stakedValue'] / 1e18:.2f} native"
+        )
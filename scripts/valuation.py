@@ -0,0 +1,268 @@
+import time
+from collections import OrderedDict
+
+from brownie import web3
+from brownie.convert import to_address
+from eth_utils import keccak
+from hexbytes import HexBytes
+
+from scripts.registry import get_registry
+
+ZERO = "0x" + "00" * 20
+MAX_POSITIONS = 1_000
+POLL_INTERVAL = 1
+
+
+def _topic(signature):
+    return "0x" + keccak(text=signature).hex()
+
+
+SYNC = _topic("Sync(uint112,uint112)")
+TRANSFER = _topic("Transfer(address,address,uint256)")
+DEPOSIT = _topic("Deposit(address,uint256,uint256)")
+WITHDRAW = _topic("Withdraw(address,uint256,uint256)")
+EMERGENCY_WITHDRAW = _topic("EmergencyWithdraw(address,uint256,uint256)")
+
+
+def _hex(value):
+    return "0x" + bytes(HexBytes(value)).hex()
+
+
+def _address(topic):
+    return to_address(_hex(topic)[-40:])
+
+
+def _words(data):
+    data = bytes(HexBytes(data))
+    return [int.from_bytes(data[i : i + 32], "big") for i in range(0, len(data), 32)]
+
+
+class Position:
+    """
+    A joint's LP position, kept up to date from events. `baseA`/`baseB` are
+    the amounts the joint would hold had it kept the tokens instead of the
+    LP. They are the reference for impermanent loss.
+    """
+
+    def __init__(self, joint, pair, masterchef, pid, a_is_token0, state):
+        self.joint = joint
+        self.pair = pair
+        self.masterchef = masterchef
+        self.pid = pid
+        self.a_is_token0 = a_is_token0
+        self.reserve0, self.reserve1 = state["reserves"]
+        self.supply = state["supply"]
+        self.lp = state["lp"]
+        self.stake = state["stake"]
+        self.baseA, self.baseB = self.amounts()
+
+    @property
+    def reserves(self):
+        # Reserves as (tokenA, tokenB)
+        if self.a_is_token0:
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+    def amounts(self):
+        reserveA, reserveB = self.reserves
+        total = self.lp + self.stake
+        if self.supply == 0:
+            return 0, 0
+        return total * reserveA // self.supply, total * reserveB // self.supply
+
+    def value(self):
+        reserveA, reserveB = self.reserves
+        amountA, amountB = self.amounts()
+        hold = self.baseA + (self.baseB * reserveA // reserveB if reserveB else 0)
+        # Both sides of the LP are worth the same at the pool price
+        value = 2 * amountA
+        return {
+            "amountA": amountA,
+            "amountB": amountB,
+            "lp": self.lp,
+            "stake": self.stake,
+            "valueA": value,
+            "holdA": hold,
+            "impermanentLoss": value / hold - 1 if hold else 0,
+        }
+
+    def _resize(self, delta):
+        # Minted or burnt LP moves the hold reference at current reserves
+        total = self.lp + self.stake
+        if delta > 0 and self.supply > 0:
+            reserveA, reserveB = self.reserves
+            self.baseA += delta * reserveA // self.supply
+            self.baseB += delta * reserveB // self.supply
+        elif delta < 0 and total > 0:
+            self.baseA = self.baseA * (total + delta) // total
+            self.baseB = self.baseB * (total + delta) // total
+
+    def on_sync(self, reserve0, reserve1):
+        self.reserve0, self.reserve1 = reserve0, reserve1
+
+    def on_transfer(self, sender, receiver, amount):
+        if receiver == self.joint and sender == ZERO:
+            self._resize(amount)
+        elif sender == self.joint and receiver == self.pair:
+            # removeLiquidity sends the LP to the pair before burning it
+            self._resize(-amount)
+        if receiver == self.joint:
+            self.lp += amount
+        if sender == self.joint:
+            self.lp -= amount
+        if sender == ZERO:
+            self.supply += amount
+        if receiver == ZERO:
+            self.supply -= amount
+
+    def on_stake(self, amount):
+        self.stake += amount
+
+
+class ValuationEngine:
+    """
+    Keeps the value and impermanent loss of many joints up to date from the
+    events of their pairs and masterchefs. Each event costs O(1) and queries
+    never hit the node. At most `max_positions` joints are kept. The least
+    recently queried is dropped first and reloaded if queried again.
+    """
+
+    def __init__(self, registry=None, max_positions=MAX_POSITIONS):
+        self.registry = registry or get_registry()
+        self.max_positions = max_positions
+        self.positions = OrderedDict()
+        self.last_block = None
+        self._by_pair = {}
+        self._by_stake = {}
+
+    def _load(self, joints):
+        # State is read at last_block so that the next poll applies every
+        # later event exactly once
+        registry = self.registry
+        if self.last_block is None:
+            self.last_block = web3.eth.block_number
+        joints = [registry.at(j, "Joint") for j in joints]
+        with registry.multicall(self.last_block):
+            meta = [(j.getPair(), j.masterchef(), j.pid(), j.tokenA()) for j in joints]
+        pairs = [registry.at(str(m[0]), "IUniswapV2Pair") for m in meta]
+        with registry.multicall(self.last_block):
+            reads = [
+                (
+                    p.token0(),
+                    p.getReserves(),
+                    p.totalSupply(),
+                    j.balanceOfPair(),
+                    j.balanceOfStake(),
+                )
+                for j, p in zip(joints, pairs)
+            ]
+
+        for j, (pair, chef, pid, tokenA), (token0, reserves, supply, lp, stake) in zip(
+            joints, meta, reads
+        ):
+            position = Position(
+                j.address,
+                str(pair),
+                str(chef),
+                int(pid),
+                str(token0) == str(tokenA),
+                {
+                    "reserves": (int(reserves[0]), int(reserves[1])),
+                    "supply": int(supply),
+                    "lp": int(lp),
+                    "stake": int(stake),
+                },
+            )
+            self._add(position)
+
+    def _add(self, position):
+        self.positions[position.joint] = position
+        self._by_pair.setdefault(position.pair, set()).add(position.joint)
+        key = (position.masterchef, position.joint, position.pid)
+        self._by_stake[key] = position.joint
+        while len(self.positions) > self.max_positions:
+            self._evict(next(iter(self.positions)))
+
+    def _evict(self, joint):
+        position = self.positions.pop(joint)
+        self._by_pair[position.pair].discard(joint)
+        if not self._by_pair[position.pair]:
+            del self._by_pair[position.pair]
+        del self._by_stake[(position.masterchef, joint, position.pid)]
+
+    def track(self, *joints):
+        new = [to_address(str(j)) for j in joints]
+        new = [j for j in new if j not in self.positions]
+        if new:
+            self.poll()
+            self._load(new)
+
+    def handle(self, log):
+        address = log["address"]
+        topics = log["topics"]
+        topic = _hex(topics[0])
+        words = _words(log["data"])
+
+        if topic == SYNC or topic == TRANSFER:
+            for joint in self._by_pair.get(address, ()):
+                position = self.positions[joint]
+                if topic == SYNC:
+                    position.on_sync(words[0], words[1])
+                else:
+                    position.on_transfer(
+                        _address(topics[1]), _address(topics[2]), words[0]
+                    )
+            return
+
+        # Masterchefs index pid or not, amount is always the last word
+        user = _address(topics[1])
+        pid = int(_hex(topics[2]), 16) if len(topics) > 2 else words[0]
+        joint = self._by_stake.get((address, user, pid))
+        if joint is None:
+            return
+        amount = words[-1]
+        self.positions[joint].on_stake(amount if topic == DEPOSIT else -amount)
+
+    def poll(self):
+        # All tracked pairs and masterchefs in one request per block range
+        block = web3.eth.block_number
+        if self.last_block is None or block <= self.last_block:
+            return 0
+        addresses = list(self._by_pair) + list({k[0] for k in self._by_stake})
+        logs = web3.eth.get_logs(
+            {
+                "address": addresses,
+                "fromBlock": self.last_block + 1,
+                "toBlock": block,
+                "topics": [[SYNC, TRANSFER, DEPOSIT, WITHDRAW, EMERGENCY_WITHDRAW]],
+            }
+        )
+        for log in logs:
+            self.handle(log)
+        self.last_block = block
+        return len(logs)
+
+    def value(self, joint):
+        joint = to_address(str(joint))
+        if joint not in self.positions:
+            # Only evicted or untracked joints hit the node
+            self.track(joint)
+        self.positions.move_to_end(joint)
+        return self.positions[joint].value()
+
+    def run(self, poll_interval=POLL_INTERVAL):
+        while True:
+            self.poll()
+            time.sleep(poll_interval)
+
+
+def main(joint_names="joint_wftm_ice"):
+    registry = get_registry()
+    engine = ValuationEngine(registry)
+    joints = [registry.address(n) for n in joint_names.split(",")]
+    engine.track(*joints)
+    while True:
+        engine.poll()
+        for name, joint in zip(joint_names.split(","), joints):
+            print(f"{name}: {engine.value(joint)}")
+        time.sleep(POLL_INTERVAL)
@@ -1,5 +1,12 @@
 import pytest
-from brownie import config, Contract
+from brownie import config
+
+from scripts.registry import get_registry
+
+
+@pytest.fixture
+def registry():
+    yield get_registry()
 
 
 @pytest.fixture
@@ -38,20 +45,20 @@ def attacker(accounts):
 
 
 @pytest.fixture
-def tokenA(vaultA):
-    yield Contract(vaultA.token())
+def tokenA(registry, vaultA):
+    yield registry.at(vaultA.token(), "IERC20Detailed")
 
 
 @pytest.fixture
-def vaultA():
+def vaultA(registry):
     # WFTM vault
-    yield Contract("0x36e7aF39b921235c4b01508BE38F27A535851a5c")
+    yield registry.vault_wftm
 
 
 @pytest.fixture
-def wftm():
+def wftm(registry):
     # WFTM token
-    yield Contract("0x21be370d5312f44cb42ce377bc9b8a0cef1a4c83")
+    yield registry.wftm
 
 
 @pytest.fixture
@@ -65,46 +72,41 @@ def tokenB_whale(accounts):
 
 
 @pytest.fixture
-def tokenB(vaultB):
-    yield Contract(vaultB.token())
+def tokenB(registry, vaultB):
+    yield registry.at(vaultB.token(), "IERC20Detailed")
 
 
 @pytest.fixture
-def vaultB():
+def vaultB(registry):
     # ICE vault
-    yield Contract("0xEea0714eC1af3b0D41C624Ba5ce09aC92F4062b1")
+    yield registry.vault_ice
 
 
 @pytest.fixture
-def ice_rewards():
+def ice_rewards(registry):
     # ICE masterchef
-    yield Contract("0x05200cb2cee4b6144b2b2984e246b52bb1afcbd0")
+    yield registry.masterchef_ice
 
 
 @pytest.fixture
-def ice():
+def ice(registry):
     # ICE token
-    yield Contract("0xf16e81dce15b08f326220742020379b855b87df9")
-
-
-@pytest.fixture
-def pancake_swap():
-    yield Contract("0x10ED43C718714eb63d5aA57B78B54704E256024E")
+    yield registry.ice
 
 
 @pytest.fixture
-def wbnb():
-    yield Contract("0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c")
+def pancake_swap(registry):
+    yield registry.router_pancake
 
 
 @pytest.fixture
-def binance_eth():
-    yield Contract("0x2170Ed0880ac9A755fd29B2688956BD959F933F8")
+def wbnb(registry):
+    yield registry.wbnb
 
 
 @pytest.fixture
-def binance_eth():
-    yield Contract("0x2170Ed0880ac9A755fd29B2688956BD959F933F8")
+def binance_eth(registry):
+    yield registry.eth
 
 
 @pytest.fixture
@@ -116,14 +118,13 @@ def cake_joint(gov, strategist, CakeJoint, wbnb, binance_eth, pancake_swap):
 
 
 @pytest.fixture
-def boo_joint(gov, keeper, strategist, BooJoint, wftm):
+def boo_joint(gov, keeper, strategist, BooJoint, wftm, registry):
     tokenA = wftm
-    tokenB = Contract("0x049d68029688eabf473097a2fc38ef61633a3c7a")
-    router = Contract("0xbe4fc72f8293f9d3512d58b969c98c3f676cb957")
+    tokenB = registry.fusdt
+    router = registry.router_spooky
     joint = gov.deploy(BooJoint, gov, keeper, strategist, tokenA, tokenB, router)
-    mc = "0x2b2929E785374c651a81A63878Ab22742656DcDd"
-    joint.setMasterChef(mc, {"from": gov})
-    joint.setReward("0x841FAD6EAe12c286d1Fd18d1d525DFfA75C7EFFE", {"from": gov})
+    joint.setMasterChef(registry.masterchef_spooky, {"from": gov})
+    joint.setReward(registry.boo, {"from": gov})
     joint.setWETH(wftm, {"from": gov})
     yield joint
 
@@ -140,9 +141,9 @@ def joint(
 
 
 @pytest.fixture
-def router():
+def router(registry):
     # Sushi in FTM
-    yield Contract("0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506")
+    yield registry.router_sushi
 
 
 @pytest.fixture
@@ -151,7 +152,7 @@ def providerA(gov, strategist, keeper, vaultA, ProviderStrategy, joint):
     strategy.setKeeper(keeper)
 
     # Steal the debt ratio from strat2 before adding
-    strat_2 = Contract(vaultA.withdrawalQueue(2))
+    strat_2 = vaultA.withdrawalQueue(2)
     debt_ratio = vaultA.strategies(strat_2).dict()["debtRatio"]
     vaultA.updateStrategyDebtRatio(strat_2, 0, {"from": vaultA.governance()})
     vaultA.addStrategy(
@@ -168,7 +169,7 @@ def providerB(gov, strategist, keeper, vaultB, ProviderStrategy, joint):
     strategy = strategist.deploy(ProviderStrategy, vaultB, joint)
 
     # Steal the debt ratio from strat0 before adding
-    strat_0 = Contract(vaultB.withdrawalQueue(0))
+    strat_0 = vaultB.withdrawalQueue(0)
     debt_ratio = vaultB.strategies(strat_0).dict()["debtRatio"]
     vaultB.updateStrategyDebtRatio(strat_0, 0, {"from": vaultB.governance()})
     vaultB.addStrategy(
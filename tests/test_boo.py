@@ -1,14 +1,14 @@
 import pytest
-from brownie import Contract, Wei, accounts, chain
+from brownie import Wei, accounts, chain
 
 
-def test_loss(boo_joint, gov, strategist):
+def test_loss(registry, boo_joint, gov, strategist):
 
-    tokenA = Contract("0x21be370d5312f44cb42ce377bc9b8a0cef1a4c83")
+    tokenA = registry.wftm
     tokenA_whale = accounts.at("0xbb634cafef389cdd03bb276c82738726079fcf2e", force=True)
     tokenA.transfer(boo_joint, Wei("16000 ether"), {"from": tokenA_whale})
 
-    tokenB = Contract("0x049d68029688eabf473097a2fc38ef61633a3c7a")
+    tokenB = registry.fusdt
     tokenB_whale = accounts.at("0xcdf46720bdf30d6bd0912162677c865d4344b0ca", force=True)
     tokenB.transfer(boo_joint, 5_000 * 1e6, {"from": tokenB_whale})
 
@@ -0,0 +1,70 @@
+from brownie import Wei
+
+
+def test_emergency_exit(
+    chain,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    gov,
+    strategist,
+    keeper,
+    tokenA_whale,
+    tokenB_whale,
+):
+
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+
+    # https://www.coingecko.com/en/coins/fantom
+    tokenA_price = 0.45
+    # https://www.coingecko.com/en/coins/popsicle-finance
+    tokenB_price = 3.68
+    usd_amount = Wei("1000 ether")
+
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, usd_amount // tokenA_price, {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, usd_amount // tokenB_price, {"from": vaultB.governance()}
+    )
+
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+    providerA.setInvestWant(False, {"from": strategist})
+    providerB.setInvestWant(False, {"from": strategist})
+    joint.harvest({"from": strategist})
+    assert joint.balanceOfStake() > 0
+
+    chain.sleep(60 * 60 * 24)
+    chain.mine(50)
+    assert joint.pendingReward() > 0
+
+    # Regular exit: three transactions that claim and swap rewards
+    chain.snapshot()
+    joint.setReinvest(False, {"from": strategist})
+    gas = joint.liquidatePosition({"from": strategist}).gas_used
+    gas += joint.harvest({"from": strategist}).gas_used
+    chain.revert()
+
+    # A keeper can get everything out in one transaction
+    tx = joint.emergencyExit({"from": keeper})
+    print(f"Emergency exit gas: {tx.gas_used}, regular exit gas: {gas}")
+
+    assert joint.reinvest() == False
+    assert joint.balanceOfStake() == 0
+    assert joint.balanceOfPair() == 0
+    assert joint.balanceOfA() == 0
+    assert joint.balanceOfB() == 0
+    assert providerA.balanceOfWant() > 0
+    assert providerB.balanceOfWant() > 0
+
+    # A second call is a no-op
+    joint.emergencyExit({"from": keeper})
@@ -0,0 +1,67 @@
+import pytest
+from urllib.request import urlopen
+from brownie import Wei
+
+from scripts.exporter import Exporter, JointTarget, serve
+
+
+def test_exporter(
+    chain,
+    registry,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, Wei("2000 ether"), {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, Wei("250 ether"), {"from": vaultB.governance()}
+    )
+    providerA.harvest({"from": strategist})
+    tx = providerB.harvest({"from": strategist})
+    joint.harvest({"from": strategist})
+
+    exporter = Exporter(registry, [JointTarget(registry, joint, "test")])
+    assert exporter.refresh()
+    # Nothing to do until a new block is mined
+    assert not exporter.refresh()
+
+    server = serve(exporter, port=0)
+    port = server.server_address[1]
+    text = urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+    server.shutdown()
+
+    metrics = parse(text)
+    assert metrics['joint_lp_staked{joint="test"}'] == pytest.approx(
+        joint.balanceOfStake() / 1e18
+    )
+    assert metrics['joint_value_a{joint="test"}'] > 0
+    gas = metrics['provider_last_harvest_gas_used{joint="test",provider="B"}']
+    assert gas == tx.gas_used
+    assert metrics["exporter_block"] == chain.height
+
+    chain.sleep(60 * 60)
+    chain.mine(1)
+    assert exporter.refresh()
+    age = 'provider_last_harvest_age_seconds{joint="test",provider="A"}'
+    assert parse(exporter.metrics())[age] >= metrics[age] + 60 * 60
+
+
+def parse(text):
+    metrics = {}
+    for line in text.splitlines():
+        key, value = line.rsplit(" ", 1)
+        metrics[key] = float(value)
+    return metrics
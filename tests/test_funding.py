@@ -0,0 +1,61 @@
+from brownie import Wei
+
+from scripts.funding import balanced_amounts, debt_limits
+
+
+def test_funding(
+    registry,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+
+    # No prices needed, the pool ratio decides how much tokenB goes with
+    # 2000 wftm
+    limits = debt_limits(joint, registry, max_amountA=Wei("2000 ether"))
+    assert limits["amountA"] == Wei("2000 ether")
+    assert limits["amountB"] > 0
+
+    # The on-chain view agrees with the calculator
+    pair = joint.getPair()
+    expected = balanced_amounts(
+        tokenA.balanceOf(pair),
+        tokenB.balanceOf(pair),
+        Wei("2000 ether"),
+        Wei("1000000 ether"),
+    )
+    assert joint.balancedAmounts(Wei("2000 ether"), Wei("1000000 ether")) == expected
+
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, limits["maxDebtPerHarvestA"], {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, limits["maxDebtPerHarvestB"], {"from": vaultB.governance()}
+    )
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+    assert joint.balanceOfA() == limits["amountA"]
+    assert joint.balanceOfB() == limits["amountB"]
+
+    # Everything is deployed by the first createLP
+    joint.harvest({"from": strategist})
+    assert joint.balanceOfStake() > 0
+    assert joint.balanceOfA() <= limits["amountA"] // 10 ** 9
+    assert joint.balanceOfB() <= limits["amountB"] // 10 ** 9
+
+
+def test_funding_deployed(registry):
+    # The deployed joint predates capitalOf, its token balances are used
+    limits = debt_limits(registry.joint_wftm_ice, registry)
+    assert all(isinstance(v, int) and v >= 0 for v in limits.values())
@@ -1,13 +1,13 @@
 import brownie
 import pytest
-from brownie import Contract, Wei
+from brownie import Wei
 
 
-def test_join_migration(chain, accounts, Joint):
+def test_join_migration(registry, chain, accounts, Joint):
 
-    providerB = Contract("0xF878E59600124ca46a30193A3F76EDAc99591698")
-    old_joint = Contract(providerB.joint())
-    providerA = Contract(old_joint.providerA())
+    providerB = registry.provider_ice
+    old_joint = registry.at(providerB.joint(), "Joint")
+    providerA = registry.at(old_joint.providerA(), "ProviderStrategy")
 
     gov = accounts.at(old_joint.governance(), force=True)
     old_joint.harvest({"from": gov})
@@ -38,9 +38,9 @@ def test_join_migration(chain, accounts, Joint):
     assert providerA.takeProfit() == False
     assert providerB.takeProfit() == False
 
-    vaultA = Contract(providerA.vault())
+    vaultA = registry.at(providerA.vault(), "IVault")
     vaultA.updateStrategyMaxDebtPerHarvest(providerA, 0, {"from": gov})
-    vaultB = Contract(providerB.vault())
+    vaultB = registry.at(providerB.vault(), "IVault")
     vaultB.updateStrategyMaxDebtPerHarvest(providerB, 0, {"from": gov})
 
     providerA.harvest({"from": gov})
@@ -0,0 +1,140 @@
+import brownie
+import pytest
+from brownie import Wei, chain
+
+from scripts.scanner import scan
+
+# The WFTM/ICE farm Joint uses by default: sushi pair, ICE masterchef pid 1
+SUSHI_FARM = ("router_sushi", "masterchef_ice", 1)
+REWARDS = {"masterchef_ice": "ice", "masterchef_spooky": "boo"}
+
+
+def _add(registry, joint, farm, gov):
+    router, chef, pid = farm
+    joint.addPosition(
+        registry[router], registry[chef], pid, registry[REWARDS[chef]], 1, {"from": gov}
+    )
+
+
+def _spooky_farm(registry, wftm, ice):
+    # The SpookySwap WFTM/ICE pair, in whichever registry masterchef stakes it
+    router = registry.router_spooky
+    pair = registry.at(router.factory(), "IUniswapV2Factory").getPair(wftm, ice)
+    for chef in REWARDS:
+        for pool in scan(chef, registry, [wftm, ice]):
+            if pool["lp"] == pair:
+                return ("router_spooky", chef, pool["pid"])
+    return None
+
+
+@pytest.fixture
+def multi_joint(gov, keeper, strategist, MultiJoint, registry, wftm, ice):
+    joint = gov.deploy(MultiJoint, gov, keeper, strategist, wftm, ice, wftm)
+    _add(registry, joint, SUSHI_FARM, gov)
+    yield joint
+
+
+@pytest.fixture
+def funded(
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    multi_joint,
+    gov,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+    providerA.setJoint(multi_joint, {"from": vaultA.governance()})
+    providerB.setJoint(multi_joint, {"from": vaultB.governance()})
+    multi_joint.setProviderA(providerA, {"from": gov})
+    multi_joint.setProviderB(providerB, {"from": gov})
+
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+
+    # https://www.coingecko.com/en/coins/fantom
+    tokenA_price = 0.45
+    # https://www.coingecko.com/en/coins/popsicle-finance
+    tokenB_price = 3.68
+    usd_amount = Wei("1000 ether")
+
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, usd_amount // tokenA_price, {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, usd_amount // tokenB_price, {"from": vaultB.governance()}
+    )
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+    yield multi_joint
+
+
+def test_multi_joint_single(registry, funded, providerA, providerB, gov, strategist):
+    multi_joint = funded
+    # A pair can only back one position
+    with brownie.reverts("!duplicate"):
+        _add(registry, multi_joint, SUSHI_FARM, gov)
+
+    multi_joint.harvest({"from": strategist})
+    stake = multi_joint.balanceOfStake(0)
+    assert stake > 0
+
+    chain.sleep(60 * 60 * 24)
+    chain.mine(50)
+
+    # Rewards are claimed, swapped and compounded into the same farm
+    multi_joint.harvest({"from": strategist})
+    assert multi_joint.balanceOfStake(0) > stake
+
+    multi_joint.setReinvest(False, {"from": strategist})
+    providerA.setInvestWant(False, {"from": strategist})
+    providerB.setInvestWant(False, {"from": strategist})
+    multi_joint.emergencyExit({"from": strategist})
+    assert multi_joint.balanceOfLP(0) == 0
+    assert providerA.balanceOfWant() > 0
+    assert providerB.balanceOfWant() > 0
+
+
+def test_multi_joint(
+    registry, funded, providerA, providerB, wftm, ice, gov, strategist
+):
+    multi_joint = funded
+    farm = _spooky_farm(registry, wftm, ice)
+    assert farm is not None, "SpookySwap WFTM/ICE is not staked in a registry chef"
+    _add(registry, multi_joint, farm, gov)
+
+    # One harvest splits the capital between both farms
+    multi_joint.harvest({"from": strategist})
+    values = [multi_joint.positionValue(i) for i in range(2)]
+    assert multi_joint.balanceOfStake(0) > 0
+    assert multi_joint.balanceOfStake(1) > 0
+    assert abs(values[0] - values[1]) < sum(values) // 20
+
+    chain.sleep(60 * 60 * 24)
+    chain.mine(50)
+
+    # Moving all the weight to the second farm unwinds the first one and
+    # compounds the rewards of both in the same transaction
+    multi_joint.setWeight(0, 0, {"from": strategist})
+    tx = multi_joint.harvest({"from": strategist})
+    print(f"Harvest and rebalance of two farms: {tx.gas_used} gas")
+    assert multi_joint.balanceOfLP(0) == 0
+    assert multi_joint.positionValue(1) + multi_joint.idleValue() > sum(values)
+
+    # Everything goes back to the providers
+    multi_joint.setReinvest(False, {"from": strategist})
+    providerA.setInvestWant(False, {"from": strategist})
+    providerB.setInvestWant(False, {"from": strategist})
+    multi_joint.liquidatePosition({"from": strategist})
+    multi_joint.harvest({"from": strategist})
+    assert multi_joint.balanceOfLP(1) == 0
+    assert multi_joint.balanceOfA() == 0
+    assert multi_joint.balanceOfB() == 0
+    assert providerA.balanceOfWant() > 0
+    assert providerB.balanceOfWant() > 0
@@ -0,0 +1,96 @@
+from brownie import Wei, accounts
+
+
+def test_partial_liquidation(
+    chain,
+    registry,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    gov,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+
+    # https://www.coingecko.com/en/coins/fantom
+    tokenA_price = 0.45
+    # https://www.coingecko.com/en/coins/popsicle-finance
+    tokenB_price = 3.68
+    usd_amount = Wei("1000 ether")
+
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, usd_amount // tokenA_price, {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, usd_amount // tokenB_price, {"from": vaultB.governance()}
+    )
+
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+    joint.harvest({"from": strategist})
+    stake = joint.balanceOfStake()
+    assert stake > 0
+
+    chain.sleep(60 * 60 * 24)
+    chain.mine(50)
+
+    # Share based exit: a quarter of the LP is removed, the rest stays staked
+    chain.snapshot()
+    tx = joint.liquidatePartialPosition(stake // 4, {"from": strategist})
+    partial_gas = tx.gas_used
+    assert joint.balanceOfStake() == stake - stake // 4
+    assert joint.balanceOfA() > 0
+    assert joint.balanceOfB() > 0
+    chain.revert()
+
+    tx = joint.liquidatePosition({"from": strategist})
+    full_gas = tx.gas_used
+    assert joint.balanceOfStake() == 0
+    print(f"Partial liquidation gas: {partial_gas}, full liquidation gas: {full_gas}")
+    chain.revert()
+
+    # A vault withdrawal goes through ProviderStrategy.liquidatePosition and
+    # only unwinds the LP needed to cover it
+    pair = joint.getPair()
+    supply = registry.at(pair, "IERC20Detailed").totalSupply()
+    reserveA = tokenA.balanceOf(pair)
+    amount = Wei("100 ether")
+    vault = accounts.at(vaultA, force=True)
+    before = tokenA.balanceOf(vaultA)
+    providerA.withdraw(amount, {"from": vault})
+    assert tokenA.balanceOf(vaultA) - before == amount
+    assert 0 < joint.balanceOfStake() < stake
+
+    # Only the value of the removed LP is turned back into tokens at the
+    # current price, a full unwind crystallises the impermanent loss of all
+    unwound = 2 * (stake - joint.balanceOfStake()) * reserveA // supply
+    unwound_full = 2 * stake * reserveA // supply
+    print(
+        f"Value unwound for {amount / 1e18} wftm: {unwound / 1e18} wftm, "
+        f"full unwind: {unwound_full / 1e18} wftm"
+    )
+    assert unwound < unwound_full // 10
+    chain.revert()
+
+    # Amount based exit: the provider only gets back what it asks for
+    amount = Wei("100 ether")
+    provider = accounts.at(providerA, force=True)
+    joint.liquidateForProvider(amount, {"from": provider})
+    assert providerA.balanceOfWant() == amount
+    assert 0 < joint.balanceOfStake() < stake
+    # The other side of the removed LP waits in the joint
+    assert joint.balanceOfB() > 0
+    print(
+        f"Stake left after liquidating for provider: {joint.balanceOfStake() / stake:.2%}"
+    )
@@ -0,0 +1,92 @@
+import pytest
+from brownie import Wei
+
+from scripts.preview import preview
+
+
+def test_preview(
+    chain,
+    registry,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, Wei("2000 ether"), {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, Wei("250 ether"), {"from": vaultB.governance()}
+    )
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+    providerA.setInvestWant(False, {"from": strategist})
+    providerB.setInvestWant(False, {"from": strategist})
+
+    # Investing is previewed from the idle balances
+    expected = preview(joint, [("harvest",)], registry)
+    joint.harvest({"from": strategist})
+    assert expected["balanceOfStake"] == pytest.approx(joint.balanceOfStake(), rel=1e-6)
+
+    chain.sleep(60 * 60 * 24)
+    chain.mine(50)
+
+    # The last harvest ignores the reward minimum, the batch is sold by ratio
+    chain.snapshot()
+    joint.setMinReward(joint.pendingReward() * 100, 0, {"from": strategist})
+    joint.setReinvest(False, {"from": strategist})
+    expected = preview(joint, [("harvest",)], registry)
+    assert len(expected["swaps"]) == 1
+    assert expected["carriedReward"] == 0
+    wantA, wantB = providerA.balanceOfWant(), providerB.balanceOfWant()
+    joint.harvest({"from": strategist})
+    assert expected["distributedA"] == pytest.approx(
+        providerA.balanceOfWant() - wantA, rel=1e-3
+    )
+    assert expected["distributedB"] == pytest.approx(
+        providerB.balanceOfWant() - wantB, rel=1e-3
+    )
+    chain.revert()
+
+    # Liquidate, rebalance and return everything to the providers
+    amount = Wei("10 ether")
+    actions = [
+        ("liquidatePosition",),
+        ("sellCapital", tokenA, tokenB, amount),
+        ("distributeProfit",),
+    ]
+    expected = preview(joint, actions, registry)
+    assert len(expected["swaps"]) == 1
+    assert expected["balanceOfStake"] == 0
+
+    joint.liquidatePosition({"from": strategist})
+    joint.sellCapital(tokenA, tokenB, amount, {"from": strategist})
+    joint.setReinvest(False, {"from": strategist})
+    joint.harvest({"from": strategist})
+
+    # Rewards keep accruing while the transactions are mined
+    assert expected["distributedA"] == pytest.approx(
+        providerA.balanceOfWant(), rel=1e-3
+    )
+    assert expected["distributedB"] == pytest.approx(
+        providerB.balanceOfWant(), rel=1e-3
+    )
+
+
+def test_preview_deployed(registry):
+    # The deployed joint has no reward threshold, every batch is sold
+    joint = registry.joint_wftm_ice
+    result = preview(joint, [("liquidatePosition",), ("distributeProfit",)], registry)
+    assert result["carriedReward"] == 0
+    assert result["balanceOfStake"] == 0
+    assert result["distributedA"] >= joint.balanceOfA()
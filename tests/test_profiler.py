@@ -0,0 +1,58 @@
+import json
+
+from scripts.profiler import Profiler
+from scripts.registry import unwrap
+
+
+def test_profiler(tmp_path, joint, tokenA, strategist):
+    with Profiler("test") as profiler:
+        with profiler.step("reads"):
+            joint.balanceOfA()
+            joint.balanceOfA()
+        joint.setReinvest(False, {"from": strategist})
+        joint.balanceOfA()
+        tokenA.symbol()
+
+    report = profiler.report()
+    steps = {s["step"]: s for s in report["steps"]}
+
+    # The same read twice in a row is redundant, after a transaction it is not
+    assert steps["reads"]["phases"]["call"]["count"] == 2
+    assert {"read": "Joint.balanceOfA", "extra": 1} in report["redundant"]
+
+    # Without a step every call or transaction is its own step
+    tx_step = steps["Joint.setReinvest"]
+    assert tx_step["count"] == 1
+    assert tx_step["phases"]["send"]["count"] == 1
+    assert tx_step["rpc"] > 1
+    assert "IERC20Detailed.symbol" in steps
+    assert report["rpc"] == sum(s["rpc"] for s in steps.values())
+
+    starts = [e["start"] for e in report["timeline"]]
+    assert starts == sorted(starts)
+
+    # Nothing is profiled once stopped
+    joint.balanceOfA()
+    assert len(profiler.report()["timeline"]) == len(report["timeline"])
+
+    path = profiler.write(tmp_path)
+    assert json.loads(path.read_text())["steps"] == json.loads(
+        json.dumps(report["steps"])
+    )
+
+
+def test_profiler_multicall(registry, joint, tokenA):
+    with Profiler("test") as profiler:
+        with profiler.step("batch"):
+            with registry.multicall():
+                balance = joint.balanceOfA()
+                symbol = tokenA.symbol()
+            assert unwrap(balance) == joint.balanceOfA()
+            assert unwrap(symbol) == tokenA.symbol()
+
+    # The queued calls go out in one aggregate call, timed as its own action
+    report = profiler.report()
+    calls = [e["name"] for e in report["timeline"] if e["kind"] == "call"]
+    assert calls[0].endswith(".tryAggregate")
+    assert "Joint.balanceOfA" in calls
+    assert {s["step"] for s in report["steps"]} == {"batch"}
@@ -0,0 +1,18 @@
+import pytest
+from brownie import web3
+
+
+def test_registry(registry, vaultA, tokenA):
+    # Every registered contract can be built from local ABIs
+    for name in registry.names():
+        contract = registry[name]
+        assert contract.address == registry.address(name)
+        assert len(web3.eth.get_code(contract.address)) > 0
+
+    # Contracts are cached after the first access
+    assert registry.vault_wftm is registry.vault_wftm
+    assert vaultA.token() == tokenA.address
+    assert tokenA.symbol() == "WFTM"
+
+    with pytest.raises(AttributeError):
+        registry.not_registered
@@ -0,0 +1,145 @@
+from brownie import Wei, accounts
+
+
+def _harvest_hourly(chain, joint, strategist, hours):
+    # Gas spent and LP added by compounding over `hours` hourly harvests
+    stake = joint.balanceOfStake()
+    gas = 0
+    for _ in range(hours):
+        chain.sleep(60 * 60)
+        chain.mine(1)
+        gas += joint.harvest({"from": strategist}).gas_used
+    return gas, joint.balanceOfStake() - stake
+
+
+def test_reward_threshold(
+    chain,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, Wei("2000 ether"), {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, Wei("250 ether"), {"from": vaultB.governance()}
+    )
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+    providerA.setInvestWant(False, {"from": strategist})
+    providerB.setInvestWant(False, {"from": strategist})
+    joint.harvest({"from": strategist})
+
+    chain.sleep(60 * 60)
+    chain.mine(1)
+    hourly_reward = joint.pendingReward()
+    assert hourly_reward > 0
+    joint.harvest({"from": strategist})
+
+    # Current behaviour: every harvest swaps and compounds
+    chain.snapshot()
+    gas, compounded = _harvest_hourly(chain, joint, strategist, 6)
+    chain.revert()
+
+    # Rewards are only claimed and swapped every three hours
+    joint.setMinReward(hourly_reward * 5 // 2, 0, {"from": strategist})
+    gas_min, compounded_min = _harvest_hourly(chain, joint, strategist, 2)
+    assert compounded_min == 0
+    assert joint.pendingReward() > hourly_reward
+    more_gas, compounded_min = _harvest_hourly(chain, joint, strategist, 4)
+    gas_min += more_gas
+    assert compounded_min > 0
+
+    print(f"Gas per LP compounded, every harvest: {gas / compounded}")
+    print(f"Gas per LP compounded, with minimum: {gas_min / compounded_min}")
+    assert gas_min / compounded_min < gas / compounded
+
+    # A minimum in value works the same and the carried batch is not capital
+    joint.setMinReward(0, joint.rewardValue(hourly_reward * 100), {"from": strategist})
+    joint.harvest({"from": strategist})
+    assert not joint.isRewardAboveMin(joint.pendingReward())
+    assert joint.capitalOf(tokenB) <= joint.balanceOfB()
+
+    # Without reinvest the minimum is ignored, the batch is sold before it is
+    # distributed so providerA gets its share
+    chain.sleep(60 * 60)
+    chain.mine(1)
+    assert not joint.isRewardAboveMin(joint.pendingReward())
+    joint.setReinvest(False, {"from": strategist})
+    wantA = providerA.balanceOfWant()
+    joint.harvest({"from": strategist})
+    assert joint.pendingReward() == 0
+    assert joint.carriedReward() == 0
+    assert providerA.balanceOfWant() > wantA
+
+
+def test_reward_threshold_provider_withdrawal(
+    chain,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, Wei("2000 ether"), {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, Wei("250 ether"), {"from": vaultB.governance()}
+    )
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+    joint.harvest({"from": strategist})
+
+    chain.sleep(60 * 60 * 24)
+    chain.mine(50)
+    pending = joint.pendingReward()
+    assert pending > 0
+    joint.setMinReward(pending * 100, 0, {"from": strategist})
+    joint.harvest({"from": strategist})
+
+    # The ICE provider is paid from its capital, the rewards paid by the
+    # masterchef withdrawal are carried for both providers
+    amount = Wei("10 ether")
+    vault = accounts.at(vaultB, force=True)
+    before = tokenB.balanceOf(vaultB)
+    providerB.withdraw(amount, {"from": vault})
+    assert tokenB.balanceOf(vaultB) - before == amount
+    assert joint.carriedReward() >= pending
+    assert joint.balanceOfB() >= joint.carriedReward()
+
+    # A second withdrawal unwinds LP instead of using the carried rewards
+    carried = joint.carriedReward()
+    stake = joint.balanceOfStake()
+    providerB.withdraw(amount, {"from": vault})
+    assert joint.balanceOfStake() < stake
+    assert joint.carriedReward() >= carried
+    assert joint.balanceOfB() >= joint.carriedReward()
+
+    # The last harvest swaps them by ratio, providerA gets its share
+    joint.setReinvest(False, {"from": strategist})
+    idleA = joint.balanceOfA()
+    wantA = providerA.balanceOfWant()
+    joint.harvest({"from": strategist})
+    assert joint.carriedReward() == 0
+    assert providerA.balanceOfWant() - wantA > idleA
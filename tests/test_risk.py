@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+
+from scripts.risk import (
+    CORRELATIONS,
+    VOLS,
+    _floats,
+    correlation_matrix,
+    impermanent_loss,
+    recommend_debt,
+    simulate,
+)
+
+
+def test_impermanent_loss():
+    assert impermanent_loss(1.0) == 0
+    # A 4x move in one token costs 20% versus holding
+    assert impermanent_loss(4.0) == pytest.approx(-0.2)
+    assert impermanent_loss(0.25) == pytest.approx(-0.2)
+
+
+def test_simulate():
+    result = simulate(days=30, paths=12_000, seed=42)
+    assert result["il"].shape == (12_000,)
+    assert (result["il"] <= 0).all()
+    assert (result["rewards"] > 0).all()
+
+    # Chunks are seeded independently of the number of processes
+    parallel = simulate(days=30, paths=12_000, seed=42, processes=2)
+    assert np.allclose(result["net"], parallel["net"])
+
+    # Cutting emissions can only lower reward income
+    cut = simulate(days=30, paths=12_000, seed=42, emission_cut_rate=12)
+    assert (cut["rewards"] <= result["rewards"]).all()
+    assert cut["rewards"].mean() < result["rewards"].mean()
+
+
+def test_recommend_debt():
+    result = simulate(days=30, paths=10_000, seed=1, reward_apr=0)
+    priceB = 4
+    debt = recommend_debt(
+        result["net"],
+        max_loss=1_000,
+        priceB=priceB,
+        vault_assetsA=10 ** 9,
+        vault_assetsB=10 ** 9,
+    )
+
+    # Both sides are worth the same and the p5 loss stays within max_loss
+    assert debt["debtA"] == pytest.approx(debt["debtB"] * priceB, rel=1e-6)
+    loss = -np.percentile(result["net"], 5) * (debt["debtA"] * 2)
+    assert loss <= 1_000 * (1 + 1e-6)
+
+
+def test_script_arguments():
+    # brownie run passes every argument as a string
+    assert _floats("0.9,1.2,1.5") == VOLS
+    assert _floats(VOLS) == VOLS
+    assert correlation_matrix(*_floats("0.6,0.5,0.5")) == correlation_matrix(
+        *CORRELATIONS
+    )
+
+    default = simulate(days=10, paths=1_000, seed=3)
+    parsed = simulate(
+        days=10,
+        paths=1_000,
+        seed=3,
+        vols=_floats("0.9,1.2,1.5"),
+        correlation=correlation_matrix(*_floats("0.6,0.5,0.5")),
+    )
+    assert np.allclose(default["net"], parsed["net"])
@@ -0,0 +1,18 @@
+import pytest
+
+from scripts.scanner import scan
+
+
+def test_scanner(registry, joint, wftm, ice):
+    pools = scan("masterchef_ice", registry)
+    assert len(pools) > 0
+    aprs = [p["apr"] for p in pools]
+    assert aprs == sorted(aprs, reverse=True)
+
+    # The WFTM/ICE pool the joint farms has both tokens in our vaults
+    pools = {p["pid"]: p for p in scan("masterchef_ice", registry, [wftm, ice])}
+    pool = pools[joint.pid()]
+    assert pool["lp"] == joint.getPair()
+    assert pool["apr"] > 0
+    lp = registry.at(joint.getPair(), "IUniswapV2Pair")
+    assert pool["staked"] == lp.balanceOf(registry.masterchef_ice)
@@ -0,0 +1,68 @@
+import pytest
+from brownie import Wei
+
+from scripts.valuation import ValuationEngine
+
+
+def test_valuation(
+    chain,
+    registry,
+    vaultA,
+    vaultB,
+    tokenA,
+    tokenB,
+    providerA,
+    providerB,
+    joint,
+    router,
+    strategist,
+    tokenA_whale,
+    tokenB_whale,
+):
+    tokenA.approve(vaultA, 2 ** 256 - 1, {"from": tokenA_whale})
+    vaultA.deposit({"from": tokenA_whale})
+    tokenB.approve(vaultB, 2 ** 256 - 1, {"from": tokenB_whale})
+    vaultB.deposit({"from": tokenB_whale})
+    vaultA.updateStrategyMaxDebtPerHarvest(
+        providerA, Wei("2000 ether"), {"from": vaultA.governance()}
+    )
+    vaultB.updateStrategyMaxDebtPerHarvest(
+        providerB, Wei("250 ether"), {"from": vaultB.governance()}
+    )
+    providerA.harvest({"from": strategist})
+    providerB.harvest({"from": strategist})
+
+    engine = ValuationEngine(registry, max_positions=10)
+    engine.track(joint)
+    assert engine.value(joint)["stake"] == 0
+
+    # Invest, then move the price with a large swap
+    joint.harvest({"from": strategist})
+    tokenA.approve(router, 2 ** 256 - 1, {"from": tokenA_whale})
+    router.swapExactTokensForTokens(
+        Wei("100_000 ether"),
+        0,
+        [tokenA, tokenB],
+        tokenA_whale,
+        2 ** 256 - 1,
+        {"from": tokenA_whale},
+    )
+    assert engine.poll() > 0
+
+    pair = registry.at(joint.getPair(), "IUniswapV2Pair")
+    value = engine.value(joint)
+    assert value["stake"] == joint.balanceOfStake()
+    assert value["lp"] == joint.balanceOfPair()
+    reserves = pair.getReserves()
+    reserveA = reserves[0] if pair.token0() == tokenA else reserves[1]
+    assert value["amountA"] == joint.balanceOfStake() * reserveA // pair.totalSupply()
+    # Selling tokenA into the pool leaves the LP worse than holding
+    assert value["impermanentLoss"] < 0
+
+    # Partial exits are followed as well
+    joint.liquidatePartialPosition(joint.balanceOfStake() // 2, {"from": strategist})
+    engine.poll()
+    value = engine.value(joint)
+    assert value["stake"] == joint.balanceOfStake()
+    assert value["lp"] == joint.balanceOfPair()
+    assert value["impermanentLoss"] < 0